@@ -0,0 +1,22 @@
+# Generated by Django 5.1.3 on 2026-10-18 11:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chats', '0003_cachedanswer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMSlotLease',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot', models.PositiveIntegerField(unique=True)),
+                ('token', models.UUIDField()),
+                ('expires_at', models.DateTimeField()),
+            ],
+        ),
+    ]
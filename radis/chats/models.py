@@ -44,3 +44,25 @@ class ChatMessage(models.Model):
 
     def __str__(self):
         return f"ChatMessage {self.pk}"
+
+
+class CachedAnswer(models.Model):
+    """An answer of the LLM that can be reused (see radis.chats.utils.answer_cache)."""
+
+    key = models.CharField(max_length=64, unique=True)
+    answer = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"CachedAnswer {self.pk}"
+
+
+class LLMSlotLease(models.Model):
+    """A lease of one of the cluster-wide LLM request slots (see radis.chats.utils.llm_limiter)."""
+
+    slot = models.PositiveIntegerField(unique=True)
+    token = models.UUIDField()
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"LLMSlotLease {self.slot}"
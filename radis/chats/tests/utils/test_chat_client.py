@@ -32,3 +32,16 @@ async def test_ask_yes_no_question(report_body, question_body, openai_chat_compl
 
         assert answer == "no"
         assert openai_no_mock.chat.completions.create.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_ask_yes_no_questions(report_body, question_body, openai_chat_completions_mock):
+    openai_mock = openai_chat_completions_mock('{"1": "Yes", "2": "No"}')
+
+    with patch("openai.AsyncOpenAI", return_value=openai_mock):
+        answers = await AsyncChatClient().ask_report_yes_no_questions(
+            report_body, [question_body, question_body]
+        )
+
+        assert answers == ["yes", "no"]
+        assert openai_mock.chat.completions.create.call_count == 1
@@ -0,0 +1,44 @@
+import pytest
+
+from radis.chats.models import LLMSlotLease
+from radis.chats.utils.llm_limiter import (
+    get_lease_timeout,
+    release_llm_slot,
+    try_acquire_llm_slot,
+)
+
+
+@pytest.mark.django_db
+def test_llm_slots_are_limited():
+    first = try_acquire_llm_slot(2, 60)
+    second = try_acquire_llm_slot(2, 60)
+
+    assert first is not None and second is not None
+    assert {first[0], second[0]} == {0, 1}
+    assert try_acquire_llm_slot(2, 60) is None
+
+    release_llm_slot(*first)
+
+    third = try_acquire_llm_slot(2, 60)
+    assert third is not None
+    assert third[0] == first[0]
+
+
+@pytest.mark.django_db
+def test_expired_llm_slot_is_taken_over():
+    expired = try_acquire_llm_slot(1, 0)
+    assert expired is not None
+
+    lease = try_acquire_llm_slot(1, 60)
+    assert lease is not None
+
+    # The expired lease must not release the slot of the new one
+    release_llm_slot(*expired)
+    assert LLMSlotLease.objects.filter(slot=lease[0], token=lease[1]).exists()
+
+
+def test_lease_outlasts_all_attempts_of_a_request(settings):
+    settings.LLM_REQUEST_TIMEOUT = 100
+    settings.LLM_REQUEST_MAX_RETRIES = 2
+
+    assert get_lease_timeout() >= 3 * 100
@@ -0,0 +1,94 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from ..models import CachedAnswer
+from .chat_client import build_yes_no_answers_grammar
+
+
+def build_answer_cache_key(context: str, question: str, prompt: str, grammar: str) -> str:
+    """Build the cache key of an LLM answer.
+
+    The key covers everything the answer depends on: the context (e.g. the report),
+    the question, the prompt template, the grammar and the model (see LLM_MODEL_URL).
+    """
+    data = [context, question, prompt, grammar, settings.LLM_MODEL_URL]
+    content = json.dumps(data, separators=(",", ":"))
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def build_yes_no_answer_cache_key(context: str, question: str, batched: bool = False) -> str:
+    """Build the cache key of a yes/no answer about a report.
+
+    Batched answers (see RAG_BATCH_QUESTIONS) are cached per question, too. The grammar
+    of a single answer is used for them, as it does not matter how many other questions
+    were asked together with it.
+    """
+    if batched:
+        prompt = (
+            settings.CHAT_REPORT_YES_NO_QUESTIONS_SYSTEM_PROMPT
+            + settings.CHAT_REPORT_QUESTIONS_USER_PROMPT
+        )
+        grammar = build_yes_no_answers_grammar(1)
+    else:
+        prompt = (
+            settings.CHAT_REPORT_YES_NO_QUESTION_SYSTEM_PROMPT
+            + settings.CHAT_REPORT_QUESTION_USER_PROMPT
+        )
+        grammar = settings.CHAT_YES_NO_ANSWER_GRAMMAR
+    return build_answer_cache_key(context, question, prompt, grammar)
+
+
+def is_answer_cache_enabled() -> bool:
+    # Without a model identity the cached answers could be from another model
+    return settings.CHAT_ANSWER_CACHE_ENABLED and bool(settings.LLM_MODEL_URL)
+
+
+async def aget_cached_answers(keys: list[str]) -> dict[str, str]:
+    """Returns the cached answers (by their key) that were found for the given keys."""
+    if not is_answer_cache_enabled() or not keys:
+        return {}
+
+    return {
+        key: answer
+        async for key, answer in CachedAnswer.objects.filter(key__in=keys).values_list(
+            "key", "answer"
+        )
+    }
+
+
+async def acache_answers(answers: dict[str, str]) -> None:
+    """Store the given answers (by their key) in the cache."""
+    if not is_answer_cache_enabled() or not answers:
+        return
+
+    # The same answer could have been stored concurrently by another worker
+    await CachedAnswer.objects.abulk_create(
+        [CachedAnswer(key=key, answer=answer) for key, answer in answers.items()],
+        ignore_conflicts=True,
+    )
+
+
+def evict_cached_answers() -> int:
+    """Delete the cached answers that are too old or exceed the maximum size of the cache.
+
+    See CHAT_ANSWER_CACHE_MAX_AGE and CHAT_ANSWER_CACHE_MAX_ENTRIES.
+
+    Returns: The number of deleted answers.
+    """
+    num_deleted, _ = CachedAnswer.objects.filter(
+        created_at__lt=timezone.now() - timedelta(days=settings.CHAT_ANSWER_CACHE_MAX_AGE)
+    ).delete()
+
+    # The oldest answers are evicted first
+    max_entries = settings.CHAT_ANSWER_CACHE_MAX_ENTRIES
+    newest_ids = CachedAnswer.objects.order_by("-id").values_list("id", flat=True)
+    oldest_kept = newest_ids[max_entries - 1 : max_entries].first()
+    if oldest_kept is not None:
+        num_evicted, _ = CachedAnswer.objects.filter(id__lt=oldest_kept).delete()
+        num_deleted += num_evicted
+
+    return num_deleted
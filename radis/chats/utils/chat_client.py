@@ -1,18 +1,25 @@
+import json
 import logging
+import zlib
 from string import Template
-from typing import Iterable, Literal
+from typing import Any, Iterable, Literal
 
 import openai
 from django.conf import settings
 from openai.types.chat import ChatCompletionMessageParam
 
+from .llm_limiter import llm_slot
+
 logger = logging.getLogger(__name__)
 
 
 class AsyncChatClient:
     def __init__(self):
         self._client = openai.AsyncOpenAI(
-            base_url=f"{settings.LLAMACPP_URL}/v1", api_key="unnecessary"
+            base_url=f"{settings.LLAMACPP_URL}/v1",
+            api_key="unnecessary",
+            timeout=settings.LLM_REQUEST_TIMEOUT,
+            max_retries=settings.LLM_REQUEST_MAX_RETRIES,
         )
 
     async def send_messages(
@@ -20,20 +27,36 @@ class AsyncChatClient:
         messages: Iterable[ChatCompletionMessageParam],
         max_tokens: int | None = None,
         yes_no_answer: bool = False,
+        grammar: str = "",
+        cache_key: str | None = None,
     ) -> str:
+        """Send messages to the LLM and return its answer.
+
+        Requests with the same cache key (e.g. the same report in the system prompt)
+        share a common prompt prefix. They are sent to the same slot of the llama.cpp
+        server (see LLAMACPP_SLOTS), which then only has to evaluate the part of the
+        prompt after the prefix.
+        """
         logger.debug(f"Sending messages to LLM:\n{messages}")
 
-        grammar = ""
+        # Let llama.cpp keep the evaluated prompt, so that it can reuse the common prefix
+        extra_body: dict[str, Any] = {"cache_prompt": True}
+        if cache_key is not None and settings.LLAMACPP_SLOTS > 0:
+            extra_body["id_slot"] = zlib.crc32(cache_key.encode()) % settings.LLAMACPP_SLOTS
+
         if yes_no_answer:
             grammar = settings.CHAT_YES_NO_ANSWER_GRAMMAR
+        if grammar:
             logger.debug(f"\nUsing grammar: {grammar}")
 
-        completion = await self._client.chat.completions.create(
-            model="option_for_local_llm_not_needed",
-            messages=messages,
-            max_tokens=max_tokens,
-            extra_body={"grammar": grammar},
-        )
+        # The number of concurrent requests is limited across all workers and web servers
+        async with llm_slot():
+            completion = await self._client.chat.completions.create(
+                model="option_for_local_llm_not_needed",
+                messages=messages,
+                max_tokens=max_tokens,
+                extra_body={**extra_body, "grammar": grammar},
+            )
         answer = completion.choices[0].message.content
         assert answer is not None
         logger.debug("Received from LLM: %s", answer)
@@ -53,6 +76,7 @@ class AsyncChatClient:
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
+            cache_key=context,
         )
 
     async def ask_report_yes_no_question(self, context: str, question: str) -> Literal["yes", "no"]:
@@ -69,6 +93,7 @@ class AsyncChatClient:
                 {"role": "user", "content": user_prompt},
             ],
             yes_no_answer=True,
+            cache_key=context,
         )
 
         if answer == "Yes":
@@ -77,3 +102,54 @@ class AsyncChatClient:
             return "no"
         else:
             raise ValueError(f"Unexpected answer: {answer}")
+
+    async def ask_report_yes_no_questions(
+        self, context: str, questions: list[str]
+    ) -> list[Literal["yes", "no"]]:
+        """Ask multiple yes/no questions about a report with a single completion.
+
+        The answer is constrained by a grammar to a JSON object with exactly one
+        answer per question.
+        """
+        system_prompt = Template(settings.CHAT_REPORT_YES_NO_QUESTIONS_SYSTEM_PROMPT).substitute(
+            {"report": context}
+        )
+        user_prompt = Template(settings.CHAT_REPORT_QUESTIONS_USER_PROMPT).substitute(
+            {
+                "questions": "\n".join(
+                    f"{number}. {question}" for number, question in enumerate(questions, start=1)
+                )
+            }
+        )
+
+        answer = await self.send_messages(
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            grammar=build_yes_no_answers_grammar(len(questions)),
+            cache_key=context,
+        )
+
+        try:
+            answers = json.loads(answer)
+            return [_to_yes_no(answers[str(number)]) for number in range(1, len(questions) + 1)]
+        except (ValueError, KeyError, TypeError) as err:
+            raise ValueError(f"Unexpected answer: {answer}") from err
+
+
+def build_yes_no_answers_grammar(num_questions: int) -> str:
+    """Build a grammar for a JSON object with a yes/no answer for each question number."""
+    members = ' ", " '.join(f'"\\"{number}\\": " Answer' for number in range(1, num_questions + 1))
+    return f"""
+root ::= "{{" {members} "}}"
+Answer ::= "\\"Yes\\"" | "\\"No\\""
+"""
+
+
+def _to_yes_no(answer: str) -> Literal["yes", "no"]:
+    if answer == "Yes":
+        return "yes"
+    elif answer == "No":
+        return "no"
+    raise ValueError(f"Unexpected answer: {answer}")
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import random
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import connection
+
+from ..models import LLMSlotLease
+
+logger = logging.getLogger(__name__)
+
+# The openai client waits at most this long (in seconds) before it retries a failed
+# request (when the server asks for it with a Retry-After header).
+MAX_RETRY_DELAY = 60
+
+
+def get_lease_timeout() -> float:
+    """Returns after how many seconds a slot lease expires.
+
+    The lease must outlast the longest possible request, i.e. all its attempts (see
+    AsyncChatClient) and the delays between them. Otherwise another request could take
+    over the slot while the first one is still running.
+    """
+    attempts = settings.LLM_REQUEST_MAX_RETRIES + 1
+    return attempts * settings.LLM_REQUEST_TIMEOUT + (attempts - 1) * MAX_RETRY_DELAY
+
+
+def try_acquire_llm_slot(limit: int, lease_timeout: float) -> tuple[int, uuid.UUID] | None:
+    """Try to lease one of the cluster-wide LLM request slots.
+
+    A slot is free if it was never leased, was released or its lease expired (e.g.
+    because the process holding it died). The unique slot number makes sure that
+    a slot can't be leased twice, even if multiple processes try it at the same time.
+
+    Returns: The slot and the token to release it, or None if all slots are leased.
+    """
+    table = LLMSlotLease._meta.db_table
+    token = uuid.uuid4()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (slot, token, expires_at)
+            SELECT s.slot, %s, now() + make_interval(secs => %s)
+            FROM generate_series(0, %s - 1) AS s(slot)
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {table} lease
+                WHERE lease.slot = s.slot AND lease.expires_at > now()
+            )
+            ORDER BY random()
+            LIMIT 1
+            ON CONFLICT (slot) DO UPDATE
+            SET token = EXCLUDED.token, expires_at = EXCLUDED.expires_at
+            WHERE {table}.expires_at <= now()
+            RETURNING slot
+            """,
+            [token, lease_timeout, limit],
+        )
+        row = cursor.fetchone()
+
+    if row is None:
+        return None
+    return row[0], token
+
+
+def release_llm_slot(slot: int, token: uuid.UUID) -> None:
+    """Release a leased LLM request slot (if it was not taken over after its lease expired)."""
+    LLMSlotLease.objects.filter(slot=slot, token=token).delete()
+
+
+@asynccontextmanager
+async def llm_slot() -> AsyncIterator[None]:
+    """Wait for a free LLM request slot and hold it while in the context.
+
+    The slots are shared by all processes that use the same database, so that at most
+    LLM_CONCURRENCY_LIMIT requests are sent to the LLM at the same time. Does nothing
+    if the limit is not set.
+    """
+    limit = settings.LLM_CONCURRENCY_LIMIT
+    if limit <= 0:
+        yield
+        return
+
+    lease_timeout = get_lease_timeout()
+    while (
+        lease := await database_sync_to_async(try_acquire_llm_slot)(limit, lease_timeout)
+    ) is None:
+        # A bit of jitter, so that the waiting requests don't all poll at the same time
+        interval = settings.LLM_CONCURRENCY_POLL_INTERVAL
+        await asyncio.sleep(interval * random.uniform(0.5, 1.5))
+
+    slot, token = lease
+    logger.debug("Acquired LLM slot %d", slot)
+    try:
+        yield
+    finally:
+        await database_sync_to_async(release_llm_slot)(slot, token)
+        logger.debug("Released LLM slot %d", slot)
@@ -71,6 +71,7 @@ async def chat_create_view(request: AuthenticatedHttpRequest) -> HttpResponse:
                     {"role": "user", "content": user_prompt},
                 ],
                 yes_no_answer=True if request.POST.get("yes_no_answer") else False,
+                cache_key=report.body if report else None,
             )
 
             # Generate a title for the chat
@@ -175,6 +176,8 @@ async def chat_update_view(request: AuthenticatedHttpRequest, pk: int) -> HttpRe
         response = await client.send_messages(
             messages,
             yes_no_answer=True if request.POST.get("yes_no_answer") else False,
+            # All the messages of the chat so far are the common prompt prefix
+            cache_key=chat.report.body if chat.report else f"chat-{chat.pk}",
         )
 
         await ChatMessage.objects.acreate(chat=chat, role=ChatRole.USER, content=prompt)
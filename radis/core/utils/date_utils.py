@@ -1,5 +1,16 @@
-from datetime import date
+from datetime import date, datetime, time
+
+from django.utils import timezone
 
 
 def calculate_age(born: date, now: date = date.today()) -> int:
     return now.year - born.year - ((now.month, now.day) < (born.month, born.day))
+
+
+def start_of_day(day: date) -> datetime:
+    """Returns the (timezone aware) start of the day in the current timezone.
+
+    Useful to filter datetime fields by date with plain range comparisons (which,
+    unlike the __date lookup, can use an index on the field).
+    """
+    return timezone.make_aware(datetime.combine(day, time.min))
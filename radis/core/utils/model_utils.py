@@ -1,6 +1,8 @@
-from typing import TYPE_CHECKING
+import json
+from typing import TYPE_CHECKING, Sequence
 
-from django.db import models
+from django.db import connection, models
+from procrastinate.jobs import JobDeferrer
 
 if TYPE_CHECKING:
     from ..models import AnalysisTask
@@ -15,3 +17,40 @@ def reset_tasks(tasks: models.QuerySet["AnalysisTask"]) -> None:
         started_at=None,
         ended_at=None,
     )
+
+
+def delay_tasks(tasks: Sequence["AnalysisTask"], deferrer: JobDeferrer) -> None:
+    """Defer a procrastinate job for each of the (already saved) tasks.
+
+    procrastinate (as of 2.15) can only defer one job per query, so the jobs are
+    deferred here with a single query that calls its defer function for each task.
+    The IDs of the queued jobs are then stored with one update instead of saving
+    each task. When called in a transaction, the workers only see the jobs after
+    it was committed (unlike delay(), which saves each task immediately).
+    """
+    if not tasks:
+        return
+
+    job = deferrer.job
+    if job.queueing_lock is not None:
+        raise ValueError("Only one job can be queued with a queueing lock.")
+
+    args = [json.dumps({**job.task_kwargs, "task_id": task.pk}) for task in tasks]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT procrastinate_defer_job(
+                %s::varchar, %s::varchar, %s::integer, %s::text, NULL::text, t.args,
+                %s::timestamptz
+            )
+            FROM unnest(%s::jsonb[]) WITH ORDINALITY AS t(args, n)
+            ORDER BY t.n
+            """,
+            [job.queue, job.task_name, job.priority, job.lock, job.scheduled_at, args],
+        )
+        job_ids = [row[0] for row in cursor.fetchall()]
+
+    for task, job_id in zip(tasks, job_ids):
+        task.queued_job_id = job_id
+
+    type(tasks[0]).objects.bulk_update(tasks, ["queued_job_id"])
@@ -5,16 +5,29 @@ class ParadeSearchConfig(AppConfig):
     name = "radis.parade_search"
 
     def ready(self):
-        from . import signals as signals
-
         register_app()
 
 
 def register_app():
     from radis.rag.site import RetrievalProvider, register_retrieval_provider
-    from radis.search.site import SearchProvider, register_search_provider
+    from radis.search.site import (
+        SearchIndexer,
+        SearchProvider,
+        register_search_indexer,
+        register_search_provider,
+    )
+    from radis.subscriptions.site import FilterProvider, register_filter_provider
+
+    from .indexers import index_reports, reindex_reports
+    from .providers import count, filter, retrieve, search
 
-    from .providers import count, retrieve, search
+    register_search_indexer(
+        SearchIndexer(
+            name="ParadeDB Search",
+            index=index_reports,
+            reindex=reindex_reports,
+        )
+    )
 
     register_search_provider(
         SearchProvider(
@@ -32,3 +45,11 @@ def register_app():
             max_results=None,
         )
     )
+
+    register_filter_provider(
+        FilterProvider(
+            name="ParadeDB Search",
+            filter=filter,
+            max_results=None,
+        )
+    )
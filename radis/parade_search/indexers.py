@@ -0,0 +1,77 @@
+from django.db import connection
+
+from radis.reports.models import Language, Report
+
+from .models import ParadeDBReport
+
+BODY_FIELDS = ["body_en", "body_de"]
+
+FILTER_FIELDS = [
+    "language_code",
+    "patient_sex",
+    "patient_age",
+    "study_datetime",
+    "modality_codes",
+    "group_ids",
+]
+
+
+def index_reports(reports: list[Report]) -> None:
+    parade_db_reports: list[ParadeDBReport] = []
+    for report in reports:
+        parade_db_report = ParadeDBReport(
+            report=report,
+            language_code=report.language.code,
+            patient_sex=report.patient_sex,
+            patient_age=report.patient_age,
+            study_datetime=report.study_datetime,
+            modality_codes=report.modality_codes,
+            group_ids=[str(group_id) for group_id in report.group_ids],
+        )
+
+        # Only the body field of the report language is filled
+        body_field_name = f"body_{report.language.code}"
+        if body_field_name in BODY_FIELDS:
+            setattr(parade_db_report, body_field_name, report.body)
+
+        parade_db_reports.append(parade_db_report)
+
+    ParadeDBReport.objects.bulk_create(
+        parade_db_reports,
+        update_conflicts=True,
+        unique_fields=["report"],
+        update_fields=BODY_FIELDS + FILTER_FIELDS,
+    )
+
+
+def reindex_reports(start_id: int, end_id: int) -> int:
+    body_columns = ", ".join(BODY_FIELDS)
+    body_values = ", ".join(
+        f"CASE WHEN l.code = '{field.removeprefix('body_')}' THEN r.body ELSE '' END"
+        for field in BODY_FIELDS
+    )
+    filter_columns = ", ".join(FILTER_FIELDS)
+    updates = ", ".join(f"{field} = EXCLUDED.{field}" for field in BODY_FIELDS + FILTER_FIELDS)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {ParadeDBReport._meta.db_table}
+                (report_id, {body_columns}, {filter_columns})
+            SELECT
+                r.id,
+                {body_values},
+                l.code,
+                r.patient_sex,
+                r.patient_age,
+                r.study_datetime,
+                r.modality_codes,
+                r.group_ids::text[]
+            FROM {Report._meta.db_table} AS r
+            INNER JOIN {Language._meta.db_table} AS l ON r.language_id = l.id
+            WHERE r.id >= %s AND r.id < %s
+            ON CONFLICT (report_id) DO UPDATE SET {updates}
+            """,
+            [start_id, end_id],
+        )
+        return cursor.rowcount
@@ -0,0 +1,112 @@
+# Generated by Django 5.1.3 on 2026-10-18 14:20
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("parade_search", "0004_create_index"),
+        ("reports", "0016_report_group_ids"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="paradedbreport",
+            name="language_code",
+            field=models.CharField(blank=True, max_length=10),
+        ),
+        migrations.AddField(
+            model_name="paradedbreport",
+            name="patient_sex",
+            field=models.CharField(blank=True, max_length=1),
+        ),
+        migrations.AddField(
+            model_name="paradedbreport",
+            name="patient_age",
+            field=models.IntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="paradedbreport",
+            name="study_datetime",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name="paradedbreport",
+            name="modality_codes",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.CharField(max_length=16), blank=True, default=list, size=None
+            ),
+        ),
+        migrations.AddField(
+            model_name="paradedbreport",
+            name="group_ids",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.CharField(max_length=16), blank=True, default=list, size=None
+            ),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE parade_search_paradedbreport AS pdr
+                SET
+                    language_code = l.code,
+                    patient_sex = r.patient_sex,
+                    patient_age = r.patient_age,
+                    study_datetime = r.study_datetime,
+                    modality_codes = r.modality_codes,
+                    group_ids = r.group_ids::text[]
+                FROM reports_report AS r
+                INNER JOIN reports_language AS l ON r.language_id = l.id
+                WHERE pdr.report_id = r.id;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        # Recreate the BM25 index with the filter fields as (untokenized) fast fields
+        migrations.RunSQL(
+            sql="""
+                DROP INDEX IF EXISTS reports_report_multilang_body_idx;
+
+                CREATE INDEX reports_report_multilang_body_idx
+                ON parade_search_paradedbreport
+                USING bm25 (
+                    id,
+                    body_en,
+                    body_de,
+                    language_code,
+                    patient_sex,
+                    patient_age,
+                    study_datetime,
+                    modality_codes,
+                    group_ids
+                )
+                WITH (
+                    key_field = 'id',
+                    text_fields = '{
+                        "body_en": {"tokenizer": {"type": "default", "stemmer": "English"}},
+                        "body_de": {"tokenizer": {"type": "default", "stemmer": "German"}},
+                        "language_code": {"tokenizer": {"type": "raw"}, "fast": true},
+                        "patient_sex": {"tokenizer": {"type": "raw"}, "fast": true},
+                        "modality_codes": {"tokenizer": {"type": "raw"}, "fast": true},
+                        "group_ids": {"tokenizer": {"type": "raw"}, "fast": true}
+                    }',
+                    numeric_fields = '{"patient_age": {"fast": true}}',
+                    datetime_fields = '{"study_datetime": {"fast": true}}'
+                );
+            """,
+            reverse_sql="""
+                DROP INDEX IF EXISTS reports_report_multilang_body_idx;
+
+                CREATE INDEX reports_report_multilang_body_idx
+                ON parade_search_paradedbreport
+                USING bm25 (id, body_en, body_de)
+                WITH (
+                    key_field = 'id',
+                    text_fields = '{
+                        "body_en": {"tokenizer": {"type": "default", "stemmer": "English"}},
+                        "body_de": {"tokenizer": {"type": "default", "stemmer": "German"}}
+                    }'
+                );
+            """,
+        ),
+    ]
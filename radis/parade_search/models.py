@@ -1,3 +1,4 @@
+from django.contrib.postgres.fields import ArrayField
 from django.db import models
 
 from radis.reports.models import Report
@@ -9,6 +10,17 @@ class ParadeDBReport(models.Model):
     body_en = models.TextField(blank=True)
     body_de = models.TextField(blank=True)
 
+    # Copies of the report fields that can be filtered on. They are indexed as fast
+    # fields by the BM25 index (see migration 0005), so that the filters can be
+    # evaluated inside the index together with the search query.
+    language_code = models.CharField(max_length=10, blank=True)
+    patient_sex = models.CharField(max_length=1, blank=True)
+    patient_age = models.IntegerField(null=True)
+    study_datetime = models.DateTimeField(null=True)
+    modality_codes = ArrayField(models.CharField(max_length=16), blank=True, default=list)
+    # The index can only look up terms in arrays of text, so the IDs are stored as text
+    group_ids = ArrayField(models.CharField(max_length=16), blank=True, default=list)
+
     def __str__(self) -> str:
         return f"Report {self.report.document_id} index model"
 
@@ -1,12 +1,17 @@
 import logging
-from typing import Iterator, cast
+from datetime import timedelta
+from typing import Any, Iterator, cast
 
 import pyparsing as pp
-from django.db.models import Q
+from django.db.models import Count, Q, Window
 from django.db.models.expressions import RawSQL
 
+from radis.core.utils.date_utils import start_of_day
 from radis.parade_search.models import ParadeDBReport
-from radis.search.site import Search, SearchFilters, SearchResult
+from radis.search.site import Search, SearchFilters, SearchResult, TotalRelation
+from radis.search.utils.count_utils import count_results
+from radis.search.utils.cursor_utils import filter_after_cursor, get_next_cursor
+from radis.search.utils.query_optimizer import optimize_query
 from radis.search.utils.query_parser import BinaryNode, ParensNode, QueryNode, TermNode, UnaryNode
 
 from .utils.document_utils import AnnotatedReportSearchVector, document_from_pgsearch_response
@@ -19,54 +24,141 @@ def sanitize_term(term: str) -> str:
     return "".join(char for char in term if char in valid_chars)
 
 
-def _build_query_string(node: QueryNode) -> str:
+# A query that matches all documents (ParadeDB can't evaluate a boolean query that only
+# excludes documents) and one that matches no documents
+MATCH_ALL = "paradedb.all()"
+MATCH_NONE = f"paradedb.boolean(must_not => ARRAY[{MATCH_ALL}])"
+
+
+def _compile_query(node: QueryNode, field: str) -> tuple[str, list[str]]:
+    """Compile a query node into a ParadeDB query (built with its query builder functions).
+
+    Returns the SQL of the query and its parameters. The whole query can then be
+    evaluated by the BM25 index in one scan.
+    """
     if isinstance(node, TermNode):
         if node.term_type == "WORD":
-            return node.value
+            # In contrast to a term query, a match query is tokenized (and stemmed)
+            # the same way as the indexed field.
+            return "paradedb.match(field => %s, value => %s)", [field, node.value]
         elif node.term_type == "PHRASE":
             terms = node.value.split()
             terms = [sanitize_term(term) for term in terms]
             terms = [term for term in terms if term]
-            terms = [f"'{term}'" for term in terms]
-            return " <-> ".join(terms)
+            if not terms:
+                return MATCH_NONE, []
+            # paradedb.phrase expects already tokenized terms, so we let the query
+            # parser tokenize the phrase with the tokenizer of the field.
+            return "paradedb.parse(%s)", [f'{field}:"{" ".join(terms)}"']
         else:
             raise ValueError(f"Unknown term type: {node.term_type}")
     elif isinstance(node, ParensNode):
-        return f"({_build_query_string(node.expression)})"
+        return _compile_query(node.expression, field)
     elif isinstance(node, UnaryNode):
         assert node.operator == "NOT"
-        return f"!{_build_query_string(node.operand)}"
+        sql, params = _compile_query(node.operand, field)
+        return f"paradedb.boolean(must => ARRAY[{MATCH_ALL}], must_not => ARRAY[{sql}])", params
     elif isinstance(node, BinaryNode):
-        if node.operator == "AND":
-            return f"{_build_query_string(node.left)} & {_build_query_string(node.right)}"
-        elif node.operator == "OR":
-            return f"{_build_query_string(node.left)} | {_build_query_string(node.right)}"
-        else:
+        if node.operator not in ("AND", "OR"):
             raise ValueError(f"Unknown operator: {node.operator}")
+
+        # Chains of the same operator are flattened into one boolean query
+        operands = _flatten_binary_node(node)
+        if node.operator == "OR":
+            clauses, params = _compile_queries(operands, field)
+            return f"paradedb.boolean(should => ARRAY[{clauses}])", params
+
+        # Negated operands of an AND are directly excluded
+        included = [operand for operand in operands if not isinstance(operand, UnaryNode)]
+        excluded = [operand.operand for operand in operands if isinstance(operand, UnaryNode)]
+        must, must_params = _compile_queries(included, field) if included else (MATCH_ALL, [])
+        if not excluded:
+            return f"paradedb.boolean(must => ARRAY[{must}])", must_params
+        must_not, must_not_params = _compile_queries(excluded, field)
+        return (
+            f"paradedb.boolean(must => ARRAY[{must}], must_not => ARRAY[{must_not}])",
+            must_params + must_not_params,
+        )
     else:
         raise ValueError(f"Unknown node type: {type(node)}")
 
 
-def _build_filter_query(filters: SearchFilters):
-    fq = Q()
+def _flatten_binary_node(node: BinaryNode) -> list[QueryNode]:
+    operands: list[QueryNode] = []
+    for child in (node.left, node.right):
+        if isinstance(child, ParensNode):
+            child = child.expression
+        if isinstance(child, BinaryNode) and child.operator == node.operator:
+            operands.extend(_flatten_binary_node(child))
+        else:
+            operands.append(child)
+    return operands
+
+
+def _compile_queries(nodes: list[QueryNode], field: str) -> tuple[str, list[str]]:
+    clauses: list[str] = []
+    params: list[str] = []
+    for node in nodes:
+        sql, node_params = _compile_query(node, field)
+        clauses.append(sql)
+        params.extend(node_params)
+    return ", ".join(clauses), params
+
+
+def _compile_filters(filters: SearchFilters) -> tuple[str, list[Any]]:
+    """Compile the filters on the fast fields of the BM25 index into a ParadeDB query.
+
+    The filters don't contribute to the score of the results.
+    """
+    clauses = ["paradedb.term(field => 'group_ids', value => %s)"]
+    params: list[Any] = [str(filters.group)]
 
-    # Apply hard filter criteria
-    if filters.patient_sex:
-        fq &= Q(report__patient_sex=filters.patient_sex)
     if filters.language:
-        fq &= Q(report__language__code=filters.language)
+        clauses.append("paradedb.term(field => 'language_code', value => %s)")
+        params.append(filters.language)
+    if filters.patient_sex:
+        clauses.append("paradedb.term(field => 'patient_sex', value => %s)")
+        params.append(filters.patient_sex)
     if filters.modalities:
-        fq &= Q(report__modalities__code__in=filters.modalities)
-    if filters.study_date_from:
-        fq &= Q(report__study_datetime__date__gte=filters.study_date_from)
-    if filters.study_date_till:
-        fq &= Q(report__study_datetime__date__lte=filters.study_date_till)
+        terms = ", ".join(
+            "paradedb.term(field => 'modality_codes', value => %s)" for _ in filters.modalities
+        )
+        clauses.append(f"paradedb.term_set(terms => ARRAY[{terms}])")
+        params.extend(filters.modalities)
+    if filters.study_date_from or filters.study_date_till:
+        clauses.append(
+            "paradedb.range(field => 'study_datetime', range => tstzrange(%s, %s, '[)'))"
+        )
+        params.append(start_of_day(filters.study_date_from) if filters.study_date_from else None)
+        params.append(
+            start_of_day(filters.study_date_till + timedelta(days=1))
+            if filters.study_date_till
+            else None
+        )
+    if filters.patient_age_from is not None or filters.patient_age_till is not None:
+        clauses.append("paradedb.range(field => 'patient_age', range => int4range(%s, %s, '[]'))")
+        params.extend([filters.patient_age_from, filters.patient_age_till])
+
+    query = f"paradedb.boolean(must => ARRAY[{', '.join(clauses)}])"
+    return f"paradedb.const_score(score => 0.0, query => {query})", params
+
+
+def _build_search_condition(search: Search) -> tuple[str, list[Any]]:
+    body_field = f"body_{search.filters.language}"
+    # The filters are evaluated together with the query inside the BM25 index
+    query_sql, query_params = _compile_query(optimize_query(search.query), body_field)
+    filters_sql, filters_params = _compile_filters(search.filters)
+    query = f"paradedb.boolean(must => ARRAY[{query_sql}, {filters_sql}])"
+    return f"parade_search_paradedbreport.id @@@ {query}", query_params + filters_params
+
+
+def _build_filter_query(filters: SearchFilters) -> Q:
+    fq = Q()
+
+    # Apply the hard filter criteria that are not evaluated by the BM25 index (see
+    # _compile_filters)
     if filters.study_description:
         fq &= Q(report__study_description__icontains=filters.study_description)
-    if filters.patient_age_from is not None:
-        fq &= Q(report__patient_age__gte=filters.patient_age_from)
-    if filters.patient_age_till is not None:
-        fq &= Q(report__patient_age__lte=filters.patient_age_till)
     if filters.patient_id:
         fq &= Q(report__patient_id=filters.patient_id)
     if filters.created_after:
@@ -78,24 +170,19 @@ def _build_filter_query(filters: SearchFilters):
 
 
 def search(search: Search) -> SearchResult:
-    query_str = _build_query_string(search.query)
     filter_query = _build_filter_query(search.filters)
     body_field = f"body_{search.filters.language}"
-
-    search_words = query_str.split(" & ")
-
-    where_clause = " AND ".join(
-        [f"parade_search_paradedbreport.{body_field} @@@ %s" for _ in search_words]
-    )
-    params = [f"{word}" for word in search_words]
-    print(body_field)
-    print(params)
+    where_clause, params = _build_search_condition(search)
     results = (
         ParadeDBReport.objects.filter(filter_query)
+        # The documents are built from the reports, but they don't need their bodies
+        .select_related("report")
+        .defer("report__body")
         .annotate(
             rank=RawSQL("paradedb.score(parade_search_paradedbreport.id)", []),
             summary=RawSQL(
-                f"paradedb.snippet(parade_search_paradedbreport.{body_field}, start_tag => '<b><u>', end_tag => '</u></b>',  max_num_chars => 20)",
+                f"paradedb.snippet(parade_search_paradedbreport.{body_field}, "
+                "start_tag => '<b><u>', end_tag => '</u></b>', max_num_chars => 20)",
                 [],
             ),
         )
@@ -103,36 +190,46 @@ def search(search: Search) -> SearchResult:
             where=[where_clause],
             params=params,
         )
-        .order_by("-rank")
+        .order_by("-rank", "-id")
     )
 
-    print(results.query)
-    print(results.count())
-    total_count = results.count()
-    print("I am summary", results[0].summary)
+    # The window function counts all the matching rows (before the slicing), so we
+    # get the total count together with the page in a single query. All matching
+    # rows must be scored anyway to order them, so an exact count comes for free.
+    page = filter_after_cursor(results, search.cursor).annotate(total_count=Window(Count("id")))
     if search.limit is None:
-        results = results[search.offset :]
+        page = page[search.offset :]
+    else:
+        page = page[search.offset : search.offset + search.limit]
+    records = list(page)
+
+    total_count: int
+    total_relation: TotalRelation
+    if search.cursor is None and records:
+        total_count, total_relation = records[0].total_count, "exact"
+    elif search.cursor is None and search.offset == 0:
+        total_count, total_relation = 0, "exact"
     else:
-        results = results[search.offset : search.offset + search.limit]
+        # The window only counts the results after the cursor (or there is no row to
+        # read it from), so we need an extra query in those cases.
+        total_count, total_relation = count_results(results, search)
+
     documents = [
-        document_from_pgsearch_response(cast(AnnotatedReportSearchVector, result))
-        for result in results
+        document_from_pgsearch_response(cast(AnnotatedReportSearchVector, record))
+        for record in records
     ]
 
-    return SearchResult(total_count=total_count, total_relation="exact", documents=documents)
+    return SearchResult(
+        total_count=total_count,
+        total_relation=total_relation,
+        documents=documents,
+        next_cursor=get_next_cursor(records, search.limit),
+    )
 
 
 def count(search: Search) -> int:
-    query_str = _build_query_string(search.query)
     filter_query = _build_filter_query(search.filters)
-    body_field = f"body_{search.filters.language}"
-
-    search_words = query_str.split(" & ")
-
-    where_clause = " AND ".join(
-        [f"parade_search_paradedbreport.{body_field} @@@ %s" for _ in search_words]
-    )
-    params = [f"{word}" for word in search_words]
+    where_clause, params = _build_search_condition(search)
     total_count = (
         ParadeDBReport.objects.filter(filter_query)
         .extra(
@@ -145,17 +242,8 @@ def count(search: Search) -> int:
 
 
 def retrieve(search: Search) -> Iterator[str]:
-    query_str = _build_query_string(search.query)
     filter_query = _build_filter_query(search.filters)
-    body_field = f"body_{search.filters.language}"
-
-    search_words = query_str.split(" & ")
-
-    # Build the WHERE clause dynamically to include all search terms
-    where_clause = " AND ".join(
-        [f"parade_search_paradedbreport.{body_field} @@@ %s" for _ in search_words]
-    )
-    params = [f"{word}" for word in search_words]
+    where_clause, params = _build_search_condition(search)
 
     # Retrieve matching results
     results = (
@@ -170,7 +258,22 @@ def retrieve(search: Search) -> Iterator[str]:
                 [],
             )
         )
-        .order_by("-rank")
+        .order_by("-rank", "-id")
+    )
+    results = filter_after_cursor(results, search.cursor).values_list(
+        "report__document_id", flat=True
+    )
+    return results.iterator()
+
+
+def filter(filter: SearchFilters) -> Iterator[str]:
+    filters_sql, filters_params = _compile_filters(filter)
+    results = (
+        ParadeDBReport.objects.filter(_build_filter_query(filter))
+        .extra(
+            where=[f"parade_search_paradedbreport.id @@@ {filters_sql}"],
+            params=filters_params,
+        )
         .values_list("report__document_id", flat=True)
     )
     return results.iterator()
@@ -67,4 +67,5 @@ def document_from_pgsearch_response(
         study_description=record.report.study_description,
         modalities=record.report.modality_codes,
         summary=summarize(snippet(record.summary, "<b><u>", 30)),
+        report=record.report,
     )
@@ -5,18 +5,30 @@ class PgSearchConfig(AppConfig):
     name = "radis.pgsearch"
 
     def ready(self):
-        from . import signals as signals
-
         register_app()
 
 
 def register_app():
     from radis.rag.site import RetrievalProvider, register_retrieval_provider
-    from radis.search.site import SearchProvider, register_search_provider
+    from radis.search.site import (
+        SearchIndexer,
+        SearchProvider,
+        register_search_indexer,
+        register_search_provider,
+    )
     from radis.subscriptions.site import FilterProvider, register_filter_provider
 
+    from .indexers import reindex_reports
     from .providers import count, filter, retrieve, search
 
+    register_search_indexer(
+        SearchIndexer(
+            name="PG Search",
+            index=None,  # The search vector is maintained by a database trigger
+            reindex=reindex_reports,
+        )
+    )
+
     register_search_provider(
         SearchProvider(
             name="PG Search",
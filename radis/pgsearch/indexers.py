@@ -0,0 +1,20 @@
+from django.db import connection
+
+from radis.reports.models import Report
+
+
+def reindex_reports(start_id: int, end_id: int) -> int:
+    # Does the same as the trigger that maintains the search vector
+    # (see migration 0002_report_search_vector_trigger).
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {Report._meta.db_table}
+            SET body_search_vector = to_tsvector(
+                pgsearch_language_config(language_id), COALESCE(body, '')
+            )
+            WHERE id >= %s AND id < %s
+            """,
+            [start_id, end_id],
+        )
+        return cursor.rowcount
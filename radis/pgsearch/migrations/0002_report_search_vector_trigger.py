@@ -0,0 +1,79 @@
+# Generated by Django 5.1.3 on 2026-10-18 11:24
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pgsearch", "0001_initial"),
+        ("reports", "0014_report_body_search_vector"),
+    ]
+
+    operations = [
+        # Maps the language of a report to a text search configuration. Must be kept
+        # in sync with pgsearch.utils.language_utils.LANGUAGES.
+        migrations.RunSQL(
+            sql="""
+                CREATE OR REPLACE FUNCTION pgsearch_language_config(language_id bigint)
+                RETURNS regconfig
+                AS $$
+                    SELECT (
+                        CASE code
+                            WHEN 'de' THEN 'german'
+                            WHEN 'en' THEN 'english'
+                            ELSE 'simple'
+                        END
+                    )::regconfig
+                    FROM reports_language
+                    WHERE id = language_id
+                $$
+                LANGUAGE sql STABLE;
+
+                CREATE OR REPLACE FUNCTION pgsearch_update_body_search_vector()
+                RETURNS trigger
+                AS $$
+                BEGIN
+                    NEW.body_search_vector := to_tsvector(
+                        pgsearch_language_config(NEW.language_id), COALESCE(NEW.body, '')
+                    );
+                    RETURN NEW;
+                END
+                $$
+                LANGUAGE plpgsql;
+
+                CREATE TRIGGER pgsearch_body_search_vector_insert
+                BEFORE INSERT ON reports_report
+                FOR EACH ROW
+                EXECUTE FUNCTION pgsearch_update_body_search_vector();
+
+                CREATE TRIGGER pgsearch_body_search_vector_update
+                BEFORE UPDATE OF body, language_id ON reports_report
+                FOR EACH ROW
+                WHEN (
+                    OLD.body IS DISTINCT FROM NEW.body
+                    OR OLD.language_id IS DISTINCT FROM NEW.language_id
+                )
+                EXECUTE FUNCTION pgsearch_update_body_search_vector();
+            """,
+            reverse_sql="""
+                DROP TRIGGER IF EXISTS pgsearch_body_search_vector_update ON reports_report;
+                DROP TRIGGER IF EXISTS pgsearch_body_search_vector_insert ON reports_report;
+                DROP FUNCTION IF EXISTS pgsearch_update_body_search_vector();
+                DROP FUNCTION IF EXISTS pgsearch_language_config(bigint);
+            """,
+        ),
+        # Take over the already calculated search vectors from the side table
+        migrations.RunSQL(
+            sql="""
+                UPDATE reports_report AS r
+                SET body_search_vector = v.search_vector
+                FROM pgsearch_reportsearchvector AS v
+                WHERE v.report_id = r.id;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.DeleteModel(
+            name="ReportSearchVector",
+        ),
+    ]
@@ -1,15 +1,20 @@
 import logging
+from datetime import timedelta
 from typing import Iterator, cast
 
 import pyparsing as pp
 from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
 from django.db.models import F, Q
 
-from radis.search.site import Search, SearchFilters, SearchResult
+from radis.core.utils.date_utils import start_of_day
+from radis.reports.models import Report
+from radis.search.site import ReportDocument, Search, SearchFilters, SearchResult
+from radis.search.utils.count_utils import count_results
+from radis.search.utils.cursor_utils import filter_after_cursor, get_next_cursor
+from radis.search.utils.query_optimizer import optimize_query
 from radis.search.utils.query_parser import BinaryNode, ParensNode, QueryNode, TermNode, UnaryNode
 
-from .models import ReportSearchVector
-from .utils.document_utils import AnnotatedReportSearchVector, document_from_pgsearch_response
+from .utils.document_utils import AnnotatedReport, document_from_pgsearch_response
 from .utils.language_utils import code_to_language
 
 logger = logging.getLogger(__name__)
@@ -51,51 +56,72 @@ def _build_query_string(node: QueryNode) -> str:
 def _build_filter_query(filters: SearchFilters) -> Q:
     fq = Q()
 
-    # Apply hard filter criteria
+    # Apply hard filter criteria (the lookups are chosen so that they can use the
+    # filter indexes of the report, e.g. no __date lookup on study_datetime)
+    fq &= Q(group_ids__contains=[filters.group])
     if filters.patient_sex:
-        fq &= Q(report__patient_sex=filters.patient_sex)
+        fq &= Q(patient_sex=filters.patient_sex)
     if filters.language:
-        fq &= Q(report__language__code=filters.language)
+        fq &= Q(language__code=filters.language)
     if filters.modalities:
-        fq &= Q(report__modalities__code__in=filters.modalities)
+        fq &= Q(modality_codes__overlap=filters.modalities)
     if filters.study_date_from:
-        fq &= Q(report__study_datetime__date__gte=filters.study_date_from)
+        fq &= Q(study_datetime__gte=start_of_day(filters.study_date_from))
     if filters.study_date_till:
-        fq &= Q(report__study_datetime__date__lte=filters.study_date_till)
+        fq &= Q(study_datetime__lt=start_of_day(filters.study_date_till + timedelta(days=1)))
     if filters.study_description:
-        fq &= Q(report__study_description__icontains=filters.study_description)
+        fq &= Q(study_description__icontains=filters.study_description)
     if filters.patient_age_from is not None:
-        fq &= Q(report__patient_age__gte=filters.patient_age_from)
+        fq &= Q(patient_age__gte=filters.patient_age_from)
     if filters.patient_age_till is not None:
-        fq &= Q(report__patient_age__lte=filters.patient_age_till)
+        fq &= Q(patient_age__lte=filters.patient_age_till)
     if filters.patient_id:
-        fq &= Q(report__patient_id=filters.patient_id)
+        fq &= Q(patient_id=filters.patient_id)
     if filters.created_after:
-        fq &= Q(report__created_at__gte=filters.created_after)
+        fq &= Q(created_at__gte=filters.created_after)
     if filters.created_before:
-        fq &= Q(report__created_at__lte=filters.created_before)
+        fq &= Q(created_at__lte=filters.created_before)
 
     return fq
 
 
 def search(search: Search) -> SearchResult:
-    query_str = _build_query_string(search.query)
+    if search.cursor is not None and search.offset:
+        raise ValueError("A cursor can't be combined with an offset.")
+
+    query_str = _build_query_string(optimize_query(search.query))
     language = code_to_language(search.filters.language)
     query = SearchQuery(query_str, search_type="raw", config=language)
     filter_query = _build_filter_query(search.filters)
     language = code_to_language(search.filters.language)
     results = (
-        ReportSearchVector.objects.filter(filter_query)
-        .filter(search_vector=query)
+        Report.objects.filter(filter_query)
+        .filter(body_search_vector=query)
         .annotate(
             rank=SearchRank(
-                F("search_vector"),
+                F("body_search_vector"),
                 query,
             )
         )
+        .order_by("-rank", "-id")
+    )
+
+    total_count, total_relation = count_results(results, search)
+    results = filter_after_cursor(results, search.cursor)
+    if search.limit is None:
+        results = results[search.offset :]
+    else:
+        results = results[search.offset : search.offset + search.limit]
+
+    # Generating the headlines is by far the most expensive part of the search (it has
+    # to parse the whole report body). So we first rank and slice without fetching the
+    # body and then only generate the headlines for the reports of the requested page.
+    reports = list(results.defer("body"))
+    summaries = dict(
+        Report.objects.filter(pk__in=[report.pk for report in reports])
         .annotate(
             summary=SearchHeadline(
-                "report__body",
+                "body",
                 query,
                 config=language,
                 start_sel="<em>",
@@ -105,59 +131,56 @@ def search(search: Search) -> SearchResult:
                 max_fragments=10,
             )
         )
-        .select_related("report")
-        .order_by("-rank")
+        .values_list("pk", "summary")
     )
 
-    total_count = results.count()
-    if search.limit is None:
-        results = results[search.offset :]
-    else:
-        results = results[search.offset : search.offset + search.limit]
-    documents = [
-        document_from_pgsearch_response(cast(AnnotatedReportSearchVector, result))
-        for result in results
-    ]
-
-    return SearchResult(total_count=total_count, total_relation="exact", documents=documents)
+    documents: list[ReportDocument] = []
+    for report in reports:
+        report = cast(AnnotatedReport, report)
+        report.summary = summaries[report.pk]
+        documents.append(document_from_pgsearch_response(report))
+
+    return SearchResult(
+        total_count=total_count,
+        total_relation=total_relation,
+        documents=documents,
+        next_cursor=get_next_cursor(reports, search.limit),
+    )
 
 
 def count(search: Search) -> int:
-    query_str = _build_query_string(search.query)
+    query_str = _build_query_string(optimize_query(search.query))
     language = code_to_language(search.filters.language)
     query = SearchQuery(query_str, search_type="raw", config=language)
     filter_query = _build_filter_query(search.filters)
     language = code_to_language(search.filters.language)
-    results = ReportSearchVector.objects.filter(filter_query).filter(search_vector=query)
+    results = Report.objects.filter(filter_query).filter(body_search_vector=query)
     return results.count()
 
 
 def retrieve(search: Search) -> Iterator[str]:
-    query_str = _build_query_string(search.query)
+    query_str = _build_query_string(optimize_query(search.query))
     language = code_to_language(search.filters.language)
     query = SearchQuery(query_str, search_type="raw", config=language)
     filter_query = _build_filter_query(search.filters)
     language = code_to_language(search.filters.language)
     results = (
-        ReportSearchVector.objects.filter(filter_query)
-        .filter(search_vector=query)
+        Report.objects.filter(filter_query)
+        .filter(body_search_vector=query)
         .annotate(
             rank=SearchRank(
-                F("search_vector"),
+                F("body_search_vector"),
                 query,
             )
         )
-        .select_related("report")
-        .order_by("-rank")
-        .values_list("report__document_id", flat=True)
+        .order_by("-rank", "-id")
     )
+    results = filter_after_cursor(results, search.cursor).values_list("document_id", flat=True)
 
     return results.iterator()
 
 
 def filter(filter: SearchFilters) -> Iterator[str]:
     filter_query = _build_filter_query(filter)
-    results = ReportSearchVector.objects.filter(filter_query).values_list(
-        "report__document_id", flat=True
-    )
+    results = Report.objects.filter(filter_query).values_list("document_id", flat=True)
     return results.iterator()
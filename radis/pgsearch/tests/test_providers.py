@@ -0,0 +1,112 @@
+import pytest
+from adit_radis_shared.accounts.factories import GroupFactory
+
+from radis.pgsearch.providers import search
+from radis.reports.factories import LanguageFactory, ReportFactory
+from radis.search.site import Search, SearchCursor, SearchFilters
+from radis.search.utils.query_parser import QueryParser
+
+
+def create_search(query: str, **filters) -> Search:
+    query_node, _ = QueryParser().parse(query)
+    assert query_node is not None
+    return Search(query=query_node, filters=SearchFilters(**filters))
+
+
+@pytest.mark.django_db
+def test_search_finds_report_created_by_factory():
+    group = GroupFactory()
+    report = ReportFactory.create(
+        language=LanguageFactory(code="en"), body="Pneumothorax of the right lung."
+    )
+    report.groups.add(group)
+
+    result = search(create_search("pneumothorax", group=group.pk, language="en"))
+
+    assert [document.document_id for document in result.documents] == [report.document_id]
+
+
+@pytest.mark.django_db
+def test_search_filters_report_created_by_factory_by_modality():
+    group = GroupFactory()
+    language = LanguageFactory(code="en")
+    ct_report = ReportFactory.create(
+        language=language, body="Pneumothorax of the right lung.", modalities=["CT"]
+    )
+    mr_report = ReportFactory.create(
+        language=language, body="Pneumothorax of the left lung.", modalities=["MR"]
+    )
+    ct_report.groups.add(group)
+    mr_report.groups.add(group)
+
+    result = search(create_search("pneumothorax", group=group.pk, language="en", modalities=["CT"]))
+
+    assert [document.document_id for document in result.documents] == [ct_report.document_id]
+
+
+@pytest.mark.django_db
+def test_search_finds_report_saved_after_its_groups_changed():
+    group = GroupFactory()
+    report = ReportFactory.create(
+        language=LanguageFactory(code="en"), body="Pneumothorax of the right lung."
+    )
+    report.groups.add(group)
+    report.pacs_name = "Other PACS"
+    report.save()
+
+    result = search(create_search("pneumothorax", group=group.pk, language="en"))
+
+    assert [document.document_id for document in result.documents] == [report.document_id]
+
+
+@pytest.mark.django_db
+def test_search_pages_through_tied_ranks_with_cursor():
+    group = GroupFactory()
+    language = LanguageFactory(code="en")
+    bodies = ["Pneumothorax of the right lung."] * 5 + ["Pneumothorax and pneumothorax."] * 2
+    for body in bodies:
+        ReportFactory.create(language=language, body=body).groups.add(group)
+    all_search = create_search("pneumothorax", group=group.pk, language="en")
+
+    expected = [
+        document.document_id for document in search(all_search._replace(limit=None)).documents
+    ]
+    document_ids: list[str] = []
+    page_search = all_search._replace(limit=2)
+    while True:
+        result = search(page_search)
+        document_ids.extend(document.document_id for document in result.documents)
+        if result.next_cursor is None:
+            break
+        page_search = page_search._replace(cursor=result.next_cursor)
+
+    assert len(expected) == len(bodies)
+    assert document_ids == expected
+
+
+@pytest.mark.django_db
+def test_search_rejects_cursor_with_offset():
+    cursor = SearchCursor(rank=0.1, id=1)
+
+    with pytest.raises(ValueError):
+        search(
+            create_search("pneumothorax", group=GroupFactory().pk)._replace(offset=2, cursor=cursor)
+        )
+
+
+@pytest.mark.django_db
+def test_search_filters_by_renamed_modality():
+    group = GroupFactory()
+    report = ReportFactory.create(
+        language=LanguageFactory(code="en"),
+        body="Pneumothorax of the right lung.",
+        modalities=["CT"],
+    )
+    report.groups.add(group)
+    modality = report.modalities.get()
+    modality.code = "CR"
+    modality.save()
+
+    result = search(create_search("pneumothorax", group=group.pk, language="en", modalities=["CR"]))
+
+    assert [document.document_id for document in result.documents] == [report.document_id]
@@ -1,8 +1,8 @@
-from radis.pgsearch.models import ReportSearchVector
+from radis.reports.models import Report
 from radis.search.site import ReportDocument
 
 
-class AnnotatedReportSearchVector(ReportSearchVector):
+class AnnotatedReport(Report):
     rank: float
     summary: str
 
@@ -11,11 +11,10 @@ class AnnotatedReportSearchVector(ReportSearchVector):
 
 
 def document_from_pgsearch_response(
-    record: AnnotatedReportSearchVector,
+    report: AnnotatedReport,
 ) -> ReportDocument:
-    report = record.report
     return ReportDocument(
-        relevance=record.rank,
+        relevance=report.rank,
         document_id=report.document_id,
         pacs_name=report.pacs_name,
         pacs_link=report.pacs_link,
@@ -23,5 +22,6 @@ def document_from_pgsearch_response(
         patient_sex=report.patient_sex,
         study_description=report.study_description,
         modalities=report.modality_codes,
-        summary=record.summary,
+        summary=report.summary,
+        report=report,
     )
@@ -7,6 +7,11 @@ from django import db
 from django.conf import settings
 from django.db.models import Prefetch
 
+from radis.chats.utils.answer_cache import (
+    acache_answers,
+    aget_cached_answers,
+    build_yes_no_answer_cache_key,
+)
 from radis.chats.utils.chat_client import AsyncChatClient
 from radis.core.processors import AnalysisTaskProcessor
 
@@ -45,12 +50,20 @@ class RagTaskProcessor(AnalysisTaskProcessor):
         await rag_instance.asave()
 
         async with sem:
-            results = await asyncio.gather(
-                *[
-                    self.process_yes_or_no_question(rag_instance, language_code, question, client)
-                    async for question in rag_instance.task.job.questions.all()
-                ]
-            )
+            if settings.RAG_BATCH_QUESTIONS:
+                questions = [question async for question in rag_instance.task.job.questions.all()]
+                results = await self.process_yes_or_no_questions(
+                    rag_instance, language_code, questions, client
+                )
+            else:
+                results = await asyncio.gather(
+                    *[
+                        self.process_yes_or_no_question(
+                            rag_instance, language_code, question, client
+                        )
+                        async for question in rag_instance.task.job.questions.all()
+                    ]
+                )
 
         if all([result == RagInstance.Result.ACCEPTED for result in results]):
             overall_result = RagInstance.Result.ACCEPTED
@@ -84,8 +97,58 @@ class RagTaskProcessor(AnalysisTaskProcessor):
         question: Question,
         client: AsyncChatClient,
     ) -> RagInstance.Result:
-        llm_answer = await client.ask_report_yes_no_question(rag_instance.text, question.question)
+        cache_key = build_yes_no_answer_cache_key(rag_instance.text, question.question)
+        cached_answers = await aget_cached_answers([cache_key])
+        if cache_key in cached_answers:
+            llm_answer = cached_answers[cache_key]
+        else:
+            llm_answer = await client.ask_report_yes_no_question(
+                rag_instance.text, question.question
+            )
+            await acache_answers({cache_key: llm_answer})
+
+        return await self.save_question_result(rag_instance, question, llm_answer)
 
+    async def process_yes_or_no_questions(
+        self,
+        rag_instance: RagInstance,
+        language: str,
+        questions: list[Question],
+        client: AsyncChatClient,
+    ) -> list[RagInstance.Result]:
+        if not questions:
+            return []
+
+        cache_keys = [
+            build_yes_no_answer_cache_key(rag_instance.text, question.question, batched=True)
+            for question in questions
+        ]
+        llm_answers = await aget_cached_answers(cache_keys)
+
+        # Only the questions without a cached answer are asked
+        uncached = [
+            (cache_key, question)
+            for cache_key, question in zip(cache_keys, questions)
+            if cache_key not in llm_answers
+        ]
+        if uncached:
+            answers = await client.ask_report_yes_no_questions(
+                rag_instance.text, [question.question for _, question in uncached]
+            )
+            new_answers = {
+                cache_key: llm_answer for (cache_key, _), llm_answer in zip(uncached, answers)
+            }
+            await acache_answers(new_answers)
+            llm_answers.update(new_answers)
+
+        return [
+            await self.save_question_result(rag_instance, question, llm_answers[cache_key])
+            for cache_key, question in zip(cache_keys, questions)
+        ]
+
+    async def save_question_result(
+        self, rag_instance: RagInstance, question: Question, llm_answer: str
+    ) -> RagInstance.Result:
         if llm_answer == "yes":
             answer = Answer.YES
         elif llm_answer == "no":
@@ -10,7 +10,10 @@ class RetrievalProvider(NamedTuple):
     - name: The name of the retrieval provider.
     - count: A function that counts the number of results for a search.
     - retrieve: A function that retrieves the document IDs
-      for a search.
+      for a search. The IDs are ordered by rank. If the search has a cursor (the
+      next_cursor of a search result of the same provider), only the results after
+      it are retrieved. The IDs themselves carry no cursor, so a retrieval can't be
+      resumed from where it was interrupted.
     - max_results: The maximum number of results that can be retrieved by this
       provider, or None if there is no limit.
     """
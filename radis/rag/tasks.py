@@ -2,9 +2,11 @@ import logging
 from itertools import batched
 
 from django.conf import settings
+from django.db import transaction
 from pebble import asynchronous
 from procrastinate.contrib.django import app
 
+from radis.core.utils.model_utils import delay_tasks
 from radis.reports.models import Report
 from radis.search.site import Search, SearchFilters
 from radis.search.utils.query_parser import QueryParser
@@ -68,15 +70,49 @@ def process_rag_job(job_id: int) -> None:
 
     logger.debug("Searching reports for task with search: %s", search)
 
-    for document_ids in batched(retrieval_provider.retrieve(search), settings.RAG_TASK_BATCH_SIZE):
-        logger.debug("Creating RAG task for document IDs: %s", document_ids)
-        task = RagTask.objects.create(job=job, status=RagTask.Status.PENDING)
-
-        for document_id in document_ids:
-            report = Report.objects.get(document_id=document_id)
-            RagInstance.objects.create(task=task, report_id=report.pk)
+    deferrer = process_rag_task.configure(
+        priority=job.urgent_priority if job.urgent else job.default_priority
+    )
 
-        task.delay()
+    # The tasks (and their report instances) are created in bulk for many retrieved
+    # documents at once, instead of one by one.
+    creation_batch_size = settings.RAG_TASK_BATCH_SIZE * settings.RAG_TASK_CREATION_BATCH_SIZE
+    for document_ids in batched(retrieval_provider.retrieve(search), creation_batch_size):
+        report_ids = dict(
+            Report.objects.filter(document_id__in=document_ids).values_list("document_id", "id")
+        )
+        if len(report_ids) < len(document_ids):
+            # The search index may contain reports that were deleted in the meantime
+            logger.warning(
+                "Skipping %d retrieved documents without a report.",
+                len(document_ids) - len(report_ids),
+            )
+
+        report_id_batches = list(
+            batched(
+                [
+                    report_ids[document_id]
+                    for document_id in document_ids
+                    if document_id in report_ids
+                ],
+                settings.RAG_TASK_BATCH_SIZE,
+            )
+        )
+
+        with transaction.atomic():
+            tasks = RagTask.objects.bulk_create(
+                [RagTask(job=job, status=RagTask.Status.PENDING) for _ in report_id_batches]
+            )
+            RagInstance.objects.bulk_create(
+                [
+                    RagInstance(task=task, report_id=report_id)
+                    for task, batch in zip(tasks, report_id_batches)
+                    for report_id in batch
+                ]
+            )
+            delay_tasks(tasks, deferrer)
+
+        logger.debug("Created %d RAG tasks for job %s", len(tasks), job)
 
     job.status = RagJob.Status.PENDING
     job.save()
@@ -0,0 +1,22 @@
+import pytest
+from procrastinate.contrib.django.models import ProcrastinateJob
+
+from radis.core.utils.model_utils import delay_tasks
+from radis.rag.factories import RagJobFactory, RagTaskFactory
+from radis.rag.tasks import process_rag_task
+
+
+@pytest.mark.django_db
+def test_delay_tasks_defers_a_job_per_task():
+    job = RagJobFactory.create()
+    tasks = RagTaskFactory.create_batch(3, job=job)
+
+    delay_tasks(tasks, process_rag_task.configure(priority=5))
+
+    for task in tasks:
+        task.refresh_from_db()
+        queued_job = ProcrastinateJob.objects.get(id=task.queued_job_id)
+        assert queued_job.task_name == "radis.rag.tasks.process_rag_task"
+        assert queued_job.queue_name == "llm"
+        assert queued_job.priority == 5
+        assert queued_job.args == {"task_id": task.pk}
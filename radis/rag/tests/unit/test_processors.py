@@ -40,3 +40,63 @@ def test_rag_task_processor(create_rag_task, openai_chat_completions_mock, mocke
         assert openai_mock.chat.completions.create.call_count == num_rag_instances * num_questions
 
     close_old_connections()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rag_task_processor_with_batched_questions(
+    create_rag_task, openai_chat_completions_mock, mocker, settings
+):
+    settings.RAG_BATCH_QUESTIONS = True
+    num_rag_instances = 5
+    num_questions = 3
+    rag_task = create_rag_task(
+        language_code="en",
+        num_questions=num_questions,
+        accepted_answer=Answer.YES,
+        num_rag_instances=num_rag_instances,
+    )
+
+    openai_mock = openai_chat_completions_mock('{"1": "Yes", "2": "Yes", "3": "Yes"}')
+
+    with patch("openai.AsyncOpenAI", return_value=openai_mock):
+        RagTaskProcessor(rag_task).start()
+
+        for instance in rag_task.rag_instances.all():
+            assert instance.overall_result == RagInstance.Result.ACCEPTED
+            assert instance.results.count() == num_questions
+            assert all([result.original_answer == Answer.YES for result in instance.results.all()])
+
+        assert openai_mock.chat.completions.create.call_count == num_rag_instances
+
+    close_old_connections()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rag_task_processor_reuses_cached_answers(
+    create_rag_task, openai_chat_completions_mock, settings
+):
+    settings.CHAT_ANSWER_CACHE_ENABLED = True
+    settings.LLM_MODEL_URL = "https://example.com/model.gguf"
+    rag_task = create_rag_task(
+        language_code="en",
+        num_questions=3,
+        accepted_answer=Answer.YES,
+        num_rag_instances=2,
+    )
+
+    openai_mock = openai_chat_completions_mock("Yes")
+    with patch("openai.AsyncOpenAI", return_value=openai_mock):
+        RagTaskProcessor(rag_task).start()
+    assert openai_mock.chat.completions.create.call_count == 6
+
+    # Processing the same reports and questions again is answered from the cache
+    openai_mock = openai_chat_completions_mock("Yes")
+    with patch("openai.AsyncOpenAI", return_value=openai_mock):
+        RagTaskProcessor(rag_task).process_task(rag_task)
+    assert openai_mock.chat.completions.create.call_count == 0
+
+    for instance in rag_task.rag_instances.all():
+        assert instance.overall_result == RagInstance.Result.ACCEPTED
+        assert all([result.original_answer == Answer.YES for result in instance.results.all()])
+
+    close_old_connections()
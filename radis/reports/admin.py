@@ -1,4 +1,5 @@
 import logging
+from typing import Any
 
 from django.contrib import admin, messages
 from django.db import transaction
@@ -15,7 +16,9 @@ admin.site.register(ReportsAppSettings, admin.ModelAdmin)
 
 
 def show_reindex_warning(request: HttpRequest) -> None:
-    messages.warning(request, "Change does not reflect index. Manual reindex required!")
+    messages.warning(
+        request, "Change does not reflect index. Manual reindex required (see reindex command)!"
+    )
 
 
 class LanguageAdmin(admin.ModelAdmin):
@@ -61,6 +64,13 @@ class MetadataInline(admin.TabularInline):
 class ReportAdmin(admin.ModelAdmin):
     inlines = [MetadataInline]
 
+    def save_model(self, request: HttpRequest, obj: Report, form: Any, change: bool) -> None:
+        # The content hash is computed from the data sent to the API. A report changed
+        # in the admin could have a stale one, so that the next update through the API
+        # would be skipped.
+        obj.content_hash = ""
+        super().save_model(request, obj, form, change)
+
     def delete_model(self, request: HttpRequest, obj: Report) -> None:
         # Called when deleting a single report (from the admin form view)
         super().delete_model(request, obj)
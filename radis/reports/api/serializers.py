@@ -1,6 +1,13 @@
+import hashlib
+import json
+from collections import Counter
+from collections.abc import Iterable
 from typing import Any
 
-from django.db import transaction
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import models, transaction
+from django.db.models import prefetch_related_objects
+from django.db.models.signals import post_save
 from rest_framework import serializers, validators
 from rest_framework.exceptions import ValidationError
 
@@ -41,6 +48,328 @@ class ModalitySerializer(serializers.ModelSerializer):
         return super().run_validation(data)
 
 
+class PrefetchablePrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """A primary key related field whose instances can be fetched in advance.
+
+    When validating a list of reports, the instances of all reports are fetched with
+    one query (see ReportListSerializer) instead of one query per primary key.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.prefetched: dict[Any, models.Model] | None = None
+
+    def to_pk(self, data: Any) -> Any:
+        if isinstance(data, bool):
+            raise TypeError
+        return self.get_queryset().model._meta.pk.to_python(data)
+
+    def prefetch(self, data: Iterable[Any]) -> None:
+        pks = set()
+        for item in data:
+            try:
+                pks.add(self.to_pk(item))
+            except (TypeError, ValueError, DjangoValidationError):
+                pass  # Fails later on when the item itself is validated
+        self.prefetched = self.get_queryset().in_bulk(pks)
+
+    def to_internal_value(self, data: Any) -> Any:
+        if self.prefetched is None:
+            return super().to_internal_value(data)
+
+        try:
+            pk = self.to_pk(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+        if pk not in self.prefetched:
+            self.fail("does_not_exist", pk_value=data)
+        return self.prefetched[pk]
+
+
+def get_or_create_by_codes[T: models.Model](model: type[T], codes: set[str]) -> dict[str, T]:
+    """Fetch the instances (e.g. languages or modalities) with the given codes and
+    create the missing ones, all in a constant number of queries."""
+    if not codes:
+        return {}
+
+    model._default_manager.bulk_create(
+        [model(code=code) for code in codes],
+        ignore_conflicts=True,
+    )
+    return {
+        getattr(instance, "code"): instance
+        for instance in model._default_manager.filter(code__in=codes)
+    }
+
+
+def compute_content_hash(validated_data: Any) -> str:
+    """Compute a hash over the (validated) data of a report.
+
+    The data is normalized first, so that the order of groups, metadata and
+    modalities does not matter.
+    """
+    data = dict(validated_data)
+    data["language"] = data["language"]["code"]
+    data["groups"] = sorted(group.pk for group in data["groups"])
+    data["metadata"] = sorted((item["key"], item["value"]) for item in data["metadata"])
+    data["modalities"] = sorted({modality["code"] for modality in data["modalities"]})
+    content = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+# The fields of a report that are maintained by database triggers.
+DERIVED_FIELDS = list(Report.DERIVED_FIELDS)
+
+# All the fields of a report that get overwritten when an existing report is upserted.
+UPSERT_FIELDS = [
+    field.name
+    for field in Report._meta.concrete_fields
+    if not field.primary_key
+    and not field.generated
+    and field.name not in ("document_id", "created_at", *DERIVED_FIELDS)
+]
+
+
+class ReportListSerializer(serializers.ListSerializer):
+    """Validates and creates or upserts a list of reports in bulk.
+
+    The uniqueness of the document IDs and the groups are validated once for the whole
+    list. Languages and modalities are resolved once per batch and the reports, metadata
+    and the through tables of the many-to-many relations are inserted with
+    bulk_create. As bulk_create does not send any model signals, we send the
+    post_save signal for each report ourselves so that its receivers still get
+    notified.
+    """
+
+    def to_internal_value(self, data: Any) -> Any:
+        if isinstance(data, list):
+            self.prefetch_groups(data)
+        return super().to_internal_value(data)
+
+    def prefetch_groups(self, data: list[Any]) -> None:
+        """Fetch the groups of all the reports with one query."""
+        groups_field = self.child.fields["groups"].child_relation
+        groups_field.prefetch(
+            group
+            for item in data
+            if isinstance(item, dict) and isinstance(item.get("groups"), list)
+            for group in item["groups"]
+        )
+
+    def validate_each(self, data: list[Any]) -> list[tuple[Any | None, Any | None]]:
+        """Validate the reports independently of each other.
+
+        In contrast to is_valid() an invalid report does not invalidate the whole list.
+        Duplicate and already existing document IDs are only reported for the
+        offending reports.
+
+        Returns: A tuple of the validated data and the errors for each report.
+        """
+        self.prefetch_groups(data)
+
+        results: list[tuple[Any | None, Any | None]] = []
+        for item in data:
+            # Allows the child to check for unknown fields (see ReportSerializer.validate)
+            self.child.initial_data = item
+            try:
+                results.append((self.child.run_validation(item), None))
+            except ValidationError as err:
+                results.append((None, err.detail))
+        if hasattr(self.child, "initial_data"):
+            del self.child.initial_data
+
+        existing: set[str] = set()
+        if not self.context.get("upsert"):
+            existing = set(
+                Report.objects.filter(
+                    document_id__in=[
+                        validated["document_id"] for validated, _ in results if validated
+                    ]
+                ).values_list("document_id", flat=True)
+            )
+
+        seen: set[str] = set()
+        for index, (validated, _) in enumerate(results):
+            if validated is None:
+                continue
+            document_id = validated["document_id"]
+            if document_id in existing:
+                error = "report with this document id already exists."
+                results[index] = (None, {"document_id": [error]})
+            elif document_id in seen:
+                results[index] = (None, {"document_id": ["Got duplicate document ID."]})
+            seen.add(document_id)
+
+        return results
+
+    def validate(self, attrs: Any) -> Any:
+        document_ids = Counter(data["document_id"] for data in attrs)
+        duplicates = {document_id for document_id, count in document_ids.items() if count > 1}
+        if duplicates:
+            raise ValidationError("Got duplicate document IDs: {}".format(duplicates))
+
+        # Existing reports get updated when upserting (see ReportSerializer.get_fields)
+        if not self.context.get("upsert"):
+            existing = set(
+                Report.objects.filter(document_id__in=document_ids).values_list(
+                    "document_id", flat=True
+                )
+            )
+            if existing:
+                raise ValidationError(
+                    "Reports with these document IDs already exist: {}".format(existing)
+                )
+
+        return super().validate(attrs)
+
+    def create(self, validated_data: list[Any]) -> list[Report]:
+        with transaction.atomic():
+            reports, relations = self._build_reports(validated_data)
+            Report.objects.bulk_create(reports)
+            self._create_relations(relations)
+            self._send_post_save(reports, created=True)
+
+        # Avoid querying the relations of each report one by one when the
+        # reports get serialized for the response.
+        prefetch_related_objects(reports, "groups", "metadata", "modalities")
+
+        return reports
+
+    def upsert(self, validated_data: list[Any]) -> tuple[list[Report], list[Report], list[Report]]:
+        """Creates or updates the reports (matched by their document ID) in one go.
+
+        Uses a single INSERT ... ON CONFLICT (document_id) DO UPDATE statement for the
+        reports themselves. The metadata, groups and modalities of updated reports are
+        replaced as a whole. Reports whose content hash did not change are skipped.
+
+        Returns: A tuple of the newly created, the updated and the unchanged reports.
+        """
+        with transaction.atomic():
+            reports, relations = self._build_reports(validated_data)
+            document_ids = [report.document_id for report in reports]
+
+            existing_hashes: dict[str, str] = dict(
+                Report.objects.select_for_update()
+                .filter(document_id__in=document_ids)
+                .values_list("document_id", "content_hash")
+            )
+
+            changed = [
+                index
+                for index, report in enumerate(reports)
+                if existing_hashes.get(report.document_id) != report.content_hash
+            ]
+            changed_reports = [reports[index] for index in changed]
+
+            if changed_reports:
+                Report.objects.bulk_create(
+                    changed_reports,
+                    update_conflicts=True,
+                    unique_fields=["document_id"],
+                    update_fields=UPSERT_FIELDS,
+                )
+
+                updated_ids = [
+                    report.pk for report in changed_reports if report.document_id in existing_hashes
+                ]
+                Metadata.objects.filter(report_id__in=updated_ids).delete()
+                Report.groups.through.objects.filter(report_id__in=updated_ids).delete()
+                Report.modalities.through.objects.filter(report_id__in=updated_ids).delete()
+                self._create_relations([relations[index] for index in changed])
+
+            # Fetch the reports again as some fields (like created_at) of the updated
+            # reports are not the ones in the database.
+            upserted = (
+                Report.objects.select_related("language")
+                .prefetch_related("groups", "metadata", "modalities")
+                .in_bulk(document_ids, field_name="document_id")
+            )
+            created: list[Report] = []
+            updated: list[Report] = []
+            unchanged: list[Report] = []
+            for index, document_id in enumerate(document_ids):
+                if document_id not in existing_hashes:
+                    created.append(upserted[document_id])
+                elif existing_hashes[document_id] != reports[index].content_hash:
+                    updated.append(upserted[document_id])
+                else:
+                    unchanged.append(upserted[document_id])
+
+            self._send_post_save(created, created=True)
+            self._send_post_save(updated, created=False)
+
+        return created, updated, unchanged
+
+    def _build_reports(
+        self, validated_data: list[Any]
+    ) -> tuple[list[Report], list[tuple[Report, list[Any], list[Any], list[Modality]]]]:
+        languages = get_or_create_by_codes(
+            Language, {data["language"]["code"] for data in validated_data}
+        )
+        modalities = get_or_create_by_codes(
+            Modality,
+            {modality["code"] for data in validated_data for modality in data["modalities"]},
+        )
+
+        reports: list[Report] = []
+        relations: list[tuple[Report, list[Any], list[Any], list[Modality]]] = []
+        for validated in validated_data:
+            data = dict(validated)
+            language = data.pop("language")
+            groups = data.pop("groups")
+            metadata = data.pop("metadata")
+            modality_codes = {modality["code"] for modality in data.pop("modalities")}
+
+            report = Report(
+                **data,
+                language=languages[language["code"]],
+                content_hash=compute_content_hash(validated),
+            )
+            reports.append(report)
+            relations.append(
+                (report, groups, metadata, [modalities[code] for code in modality_codes])
+            )
+
+        return reports, relations
+
+    def _create_relations(
+        self, relations: list[tuple[Report, list[Any], list[Any], list[Modality]]]
+    ) -> None:
+        GroupsThrough = Report.groups.through
+        ModalitiesThrough = Report.modalities.through
+
+        metadata_instances: list[Metadata] = []
+        report_groups = []
+        report_modalities = []
+        for report, groups, metadata, modalities in relations:
+            for item in metadata:
+                metadata_instances.append(Metadata(report_id=report.pk, **item))
+            for group in groups:
+                report_groups.append(GroupsThrough(report_id=report.pk, group_id=group.pk))
+            for modality in modalities:
+                report_modalities.append(
+                    ModalitiesThrough(report_id=report.pk, modality_id=modality.pk)
+                )
+
+        # A concurrent upsert of the same (new) reports could have created the same
+        # relations in the meantime.
+        Metadata.objects.bulk_create(metadata_instances, ignore_conflicts=True)
+        GroupsThrough.objects.bulk_create(report_groups, ignore_conflicts=True)
+        ModalitiesThrough.objects.bulk_create(report_modalities, ignore_conflicts=True)
+
+    def _send_post_save(self, reports: list[Report], created: bool) -> None:
+        for report in reports:
+            post_save.send(
+                sender=Report,
+                instance=report,
+                created=created,
+                update_fields=None,
+                raw=False,
+                using=Report.objects.db,
+            )
+
+
 class ReportSerializer(serializers.ModelSerializer):
     language = LanguageSerializer()
     metadata = MetadataSerializer(many=True)
@@ -48,9 +377,26 @@ class ReportSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Report
-        fields = "__all__"
+        exclude = DERIVED_FIELDS
+        list_serializer_class = ReportListSerializer
+
+    serializer_related_field = PrefetchablePrimaryKeyRelatedField
+
+    def get_fields(self) -> dict[str, Any]:
+        fields = super().get_fields()
+        if self.context.get("upsert") or isinstance(self.parent, ReportListSerializer):
+            # Existing reports get updated when upserting, so we don't want to check
+            # if a report with this document ID already exists. In a list of reports
+            # this is checked for all reports at once (see ReportListSerializer).
+            fields["document_id"].validators = [
+                validator
+                for validator in fields["document_id"].validators
+                if not isinstance(validator, validators.UniqueValidator)
+            ]
+        return fields
 
     def create(self, validated_data: Any) -> Any:
+        content_hash = compute_content_hash(validated_data)
         language = validated_data.pop("language")
         groups = validated_data.pop("groups")
         metadata = validated_data.pop("metadata")
@@ -59,7 +405,9 @@ class ReportSerializer(serializers.ModelSerializer):
         with transaction.atomic():
             language_instance, _ = Language.objects.get_or_create(**language)
 
-            report = Report.objects.create(**validated_data, language=language_instance)
+            report = Report.objects.create(
+                **validated_data, language=language_instance, content_hash=content_hash
+            )
 
             report.groups.set(groups)
 
@@ -76,6 +424,11 @@ class ReportSerializer(serializers.ModelSerializer):
         return report
 
     def update(self, report: Report, validated_data: Any) -> Any:
+        content_hash = compute_content_hash(validated_data)
+        if report.content_hash == content_hash:
+            # Nothing changed, so we don't touch the report (and its search index)
+            return report
+
         language = validated_data.pop("language")
         groups = validated_data.pop("groups")
         metadata = validated_data.pop("metadata")
@@ -84,6 +437,7 @@ class ReportSerializer(serializers.ModelSerializer):
         with transaction.atomic():
             language_instance = Language.objects.get(**language)
             report.language = language_instance
+            report.content_hash = content_hash
 
             for attr, value in validated_data.items():
                 setattr(report, attr, value)
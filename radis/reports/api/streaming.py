@@ -0,0 +1,27 @@
+import gzip
+from typing import IO, Iterator
+
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_ndjson_lines(stream: IO[bytes], compressed: bool = False) -> Iterator[tuple[int, bytes]]:
+    """Iterate over the lines of an (optionally gzip-compressed) NDJSON stream.
+
+    The stream is read and decompressed in fixed-size chunks, so the whole body never
+    has to be held in memory. Yields tuples of the (1-based) line number and the raw
+    line. Blank lines are skipped.
+    """
+    if compressed:
+        stream = gzip.GzipFile(fileobj=stream, mode="rb")
+
+    line_number = 0
+    remainder = b""
+    while chunk := stream.read(CHUNK_SIZE):
+        *lines, remainder = (remainder + chunk).split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+
+    if remainder.strip():
+        yield line_number + 1, remainder
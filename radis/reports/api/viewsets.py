@@ -1,9 +1,16 @@
+import json
 import logging
-from typing import Any
+import zlib
+from itertools import islice
+from typing import Any, AsyncIterator, Iterable, cast
 
-from django.db import transaction
-from django.http import Http404
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.http import Http404, StreamingHttpResponse
+from procrastinate.contrib.django import app
 from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.exceptions import MethodNotAllowed
 from rest_framework.permissions import IsAdminUser
 from rest_framework.request import Request, clone_request
@@ -17,7 +24,8 @@ from ..site import (
     reports_deleted_handlers,
     reports_updated_handlers,
 )
-from .serializers import ReportSerializer
+from .serializers import ReportListSerializer, ReportSerializer
+from .streaming import iter_ndjson_lines
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +52,9 @@ class ReportViewSet(
             kwargs["many"] = True
         return super().get_serializer(*args, **kwargs)
 
+    def is_upsert(self) -> bool:
+        return self.request.GET.get("upsert", "").lower() in ["true", "1", "yes"]
+
     def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         """Retrieve a single Report.
 
@@ -65,6 +76,27 @@ class ReportViewSet(
 
         return Response(data)
 
+    def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        # A list of reports can be upserted in bulk (matched by their document IDs)
+        if not self.is_upsert() or not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+
+        serializer = self.get_serializer(
+            data=request.data, context={**self.get_serializer_context(), "upsert": True}
+        )
+        serializer.is_valid(raise_exception=True)
+        created, updated, unchanged = cast(ReportListSerializer, serializer).upsert(
+            cast(list[Any], serializer.validated_data)
+        )
+        serializer.instance = created + updated + unchanged
+
+        if created:
+            self.handle_created_reports(created)
+        if updated:
+            self.handle_updated_reports(updated)
+
+        return Response(serializer.data)
+
     def perform_create(self, serializer: BaseSerializer) -> None:
         super().perform_create(serializer)
         assert serializer.instance
@@ -72,19 +104,122 @@ class ReportViewSet(
         if not isinstance(reports, list):
             reports = [reports]
 
-        def on_commit():
-            for handler in reports_created_handlers:
-                document_ids = [report.document_id for report in reports]
-                logger.debug(f"{handler.name} - handle newly created reports: {document_ids}")
-                handler.handle(reports)
+        self.handle_created_reports(reports)
 
-        transaction.on_commit(on_commit)
+    def handle_created_reports(self, reports: list[Report]) -> None:
+        # The handlers are called by a worker so that (external) indexing
+        # does not slow down the API requests.
+        if not reports_created_handlers:
+            return
+
+        report_ids = [report.pk for report in reports]
+        transaction.on_commit(
+            lambda: app.configure_task(
+                "radis.reports.tasks.handle_reports_created", allow_unknown=False
+            ).defer(report_ids=report_ids)
+        )
+
+    @action(detail=False, methods=["post"], url_path="stream")
+    def stream(self, request: Request, *args: Any, **kwargs: Any) -> StreamingHttpResponse:
+        """Create reports from a newline-delimited JSON (NDJSON) stream.
+
+        The request body contains one report per line and may be gzip-compressed
+        (signaled by the Content-Encoding header). In contrast to the other endpoints
+        the body is not loaded as a whole, but is parsed, validated and committed
+        incrementally in batches. The response is also an NDJSON stream with one
+        result per (non-blank) input line. If the body can't be read any further (e.g.
+        because of a corrupt compression), the stream ends with an error line.
+        """
+        compressed = request.headers.get("Content-Encoding", "").lower() == "gzip"
+        lines = iter_ndjson_lines(request.stream, compressed) if request.stream else iter([])
+
+        def create_next_batch() -> tuple[list[dict[str, Any]], bool]:
+            """Create the reports of the next batch of lines.
+
+            Returns: The results of the batch and if the end of the stream was reached.
+            """
+            batch: list[tuple[int, bytes]] = []
+            try:
+                for line in islice(lines, settings.REPORTS_STREAM_BATCH_SIZE):
+                    batch.append(line)
+            except (OSError, EOFError, UnicodeDecodeError, zlib.error) as err:
+                # A corrupt or truncated body can't be read any further, but the lines
+                # read so far are still processed.
+                logger.warning("Failed to read the reports stream: %s", err)
+                results = self.create_reports_batch(batch)
+                results.append({"error": f"Failed to read the request body: {err}"})
+                return results, True
+
+            done = len(batch) < settings.REPORTS_STREAM_BATCH_SIZE
+            return self.create_reports_batch(batch), done
+
+        # Under ASGI (daphne) a synchronous iterator would be consumed as a whole before
+        # anything is sent, so the results are yielded by an async generator instead.
+        async def results() -> AsyncIterator[str]:
+            done = False
+            while not done:
+                batch_results, done = await database_sync_to_async(create_next_batch)()
+                for result in batch_results:
+                    yield json.dumps(result) + "\n"
+
+        return StreamingHttpResponse(results(), content_type="application/x-ndjson")
+
+    def create_reports_batch(self, lines: Iterable[tuple[int, bytes]]) -> list[dict[str, Any]]:
+        results: list[dict[str, Any]] = []
+        parsed: list[tuple[int, Any]] = []
+
+        for line_number, line in lines:
+            try:
+                data = json.loads(line)
+            except ValueError as err:
+                results.append({"line": line_number, "status": "error", "errors": str(err)})
+                continue
+
+            if not isinstance(data, dict):
+                results.append(
+                    {"line": line_number, "status": "error", "errors": "Invalid report type."}
+                )
+                continue
+
+            parsed.append((line_number, data))
+
+        # The whole batch is validated at once, so that the lookups (e.g. if a report
+        # already exists) need only one query per batch.
+        serializer = cast(ReportListSerializer, self.get_serializer(many=True))
+        validated: list[tuple[int, Any]] = []
+        for (line_number, _), (validated_data, errors) in zip(
+            parsed, serializer.validate_each([data for _, data in parsed])
+        ):
+            if errors is not None:
+                results.append({"line": line_number, "status": "error", "errors": errors})
+            else:
+                validated.append((line_number, validated_data))
+
+        if validated:
+            try:
+                with transaction.atomic():
+                    reports: list[Report] = serializer.create([data for _, data in validated])
+                    self.handle_created_reports(reports)
+            except DatabaseError as err:
+                logger.exception("Failed to create reports batch.")
+                for line_number, _ in validated:
+                    results.append({"line": line_number, "status": "error", "errors": str(err)})
+            else:
+                for (line_number, _), report in zip(validated, reports):
+                    results.append(
+                        {
+                            "line": line_number,
+                            "status": "created",
+                            "document_id": report.document_id,
+                        }
+                    )
+
+        return sorted(results, key=lambda result: result["line"])
 
     def update(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         # DRF itself does not support upsert.
         # Workaround adapted from https://gist.github.com/tomchristie/a2ace4577eff2c603b1b
-        upsert = request.GET.get("upsert", "").lower() in ["true", "1", "yes"]
-        if not upsert:
+        if not self.is_upsert():
             return super().update(request, *args, **kwargs)
         else:
             instance = self.get_object_or_none()
@@ -108,19 +243,29 @@ class ReportViewSet(
                 raise
 
     def perform_update(self, serializer: BaseSerializer) -> None:
-        super().perform_update(serializer)
         assert serializer.instance
+        content_hash = serializer.instance.content_hash
+        super().perform_update(serializer)
+        if content_hash and serializer.instance.content_hash == content_hash:
+            # The report did not change at all (see ReportSerializer.update)
+            return
+
         reports: list[Report] | Report = serializer.instance
         if not isinstance(reports, list):
             reports = [reports]
 
-        def on_commit():
-            for handler in reports_updated_handlers:
-                document_ids = [report.document_id for report in reports]
-                logger.debug(f"{handler.name} - handle updated reports: {document_ids}")
-                handler.handle(reports)
+        self.handle_updated_reports(reports)
 
-        transaction.on_commit(on_commit)
+    def handle_updated_reports(self, reports: list[Report]) -> None:
+        if not reports_updated_handlers:
+            return
+
+        report_ids = [report.pk for report in reports]
+        transaction.on_commit(
+            lambda: app.configure_task(
+                "radis.reports.tasks.handle_reports_updated", allow_unknown=False
+            ).defer(report_ids=report_ids)
+        )
 
     def partial_update(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         # Disallow partial updates
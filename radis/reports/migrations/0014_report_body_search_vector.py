@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-18 11:20
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0013_report_content_hash'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='report',
+            options={'base_manager_name': 'objects'},
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='body_search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['body_search_vector'], name='report_body_search_vector_gin'),
+        ),
+    ]
@@ -0,0 +1,112 @@
+# Generated by Django 5.1.3 on 2026-10-18 12:05
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0014_report_body_search_vector'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='report',
+            name='modality_codes',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=16), blank=True, default=list, editable=False, size=None),
+        ),
+        # Keeps the modality codes of the reports in sync with the through table. The
+        # triggers are statement level ones, so that a bulk insert of the relations
+        # only updates each affected report once.
+        migrations.RunSQL(
+            sql="""
+                CREATE OR REPLACE FUNCTION reports_update_modality_codes(report_ids bigint[])
+                RETURNS void
+                AS $$
+                    UPDATE reports_report AS r
+                    SET modality_codes = COALESCE(
+                        (
+                            SELECT array_agg(m.code ORDER BY m.code)
+                            FROM reports_report_modalities AS rm
+                            JOIN reports_modality AS m ON m.id = rm.modality_id
+                            WHERE rm.report_id = r.id
+                        ),
+                        '{}'
+                    )
+                    WHERE r.id = ANY(report_ids)
+                $$
+                LANGUAGE sql;
+
+                CREATE OR REPLACE FUNCTION reports_report_modalities_changed()
+                RETURNS trigger
+                AS $$
+                BEGIN
+                    IF TG_OP = 'INSERT' THEN
+                        PERFORM reports_update_modality_codes(
+                            ARRAY(SELECT DISTINCT report_id FROM new_rows)
+                        );
+                    ELSE
+                        PERFORM reports_update_modality_codes(
+                            ARRAY(SELECT DISTINCT report_id FROM old_rows)
+                        );
+                    END IF;
+                    RETURN NULL;
+                END
+                $$
+                LANGUAGE plpgsql;
+
+                CREATE TRIGGER reports_modality_codes_insert
+                AFTER INSERT ON reports_report_modalities
+                REFERENCING NEW TABLE AS new_rows
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION reports_report_modalities_changed();
+
+                CREATE TRIGGER reports_modality_codes_delete
+                AFTER DELETE ON reports_report_modalities
+                REFERENCING OLD TABLE AS old_rows
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION reports_report_modalities_changed();
+
+                UPDATE reports_report AS r
+                SET modality_codes = codes.modality_codes
+                FROM (
+                    SELECT rm.report_id, array_agg(m.code ORDER BY m.code) AS modality_codes
+                    FROM reports_report_modalities AS rm
+                    JOIN reports_modality AS m ON m.id = rm.modality_id
+                    GROUP BY rm.report_id
+                ) AS codes
+                WHERE codes.report_id = r.id;
+            """,
+            reverse_sql="""
+                DROP TRIGGER IF EXISTS reports_modality_codes_delete ON reports_report_modalities;
+                DROP TRIGGER IF EXISTS reports_modality_codes_insert ON reports_report_modalities;
+                DROP FUNCTION IF EXISTS reports_report_modalities_changed();
+                DROP FUNCTION IF EXISTS reports_update_modality_codes(bigint[]);
+            """,
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['modality_codes'], name='report_modality_codes_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('study_description'), name='gin_trgm_ops'), name='report_study_description_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['study_datetime'], name='report_study_datetime_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['patient_sex', 'patient_age', 'study_datetime'], name='report_sex_age_datetime_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['patient_id'], name='report_patient_id_idx'),
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 5.1.3 on 2026-10-18 12:40
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0015_report_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='group_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), blank=True, default=list, editable=False, size=None),
+        ),
+        # Keeps the group IDs of the reports in sync with the through table (the same
+        # way as the modality codes, see migration 0015).
+        migrations.RunSQL(
+            sql="""
+                CREATE OR REPLACE FUNCTION reports_update_group_ids(report_ids bigint[])
+                RETURNS void
+                AS $$
+                    UPDATE reports_report AS r
+                    SET group_ids = COALESCE(
+                        (
+                            SELECT array_agg(rg.group_id ORDER BY rg.group_id)
+                            FROM reports_report_groups AS rg
+                            WHERE rg.report_id = r.id
+                        ),
+                        '{}'
+                    )
+                    WHERE r.id = ANY(report_ids)
+                $$
+                LANGUAGE sql;
+
+                CREATE OR REPLACE FUNCTION reports_report_groups_changed()
+                RETURNS trigger
+                AS $$
+                BEGIN
+                    IF TG_OP = 'INSERT' THEN
+                        PERFORM reports_update_group_ids(
+                            ARRAY(SELECT DISTINCT report_id FROM new_rows)
+                        );
+                    ELSE
+                        PERFORM reports_update_group_ids(
+                            ARRAY(SELECT DISTINCT report_id FROM old_rows)
+                        );
+                    END IF;
+                    RETURN NULL;
+                END
+                $$
+                LANGUAGE plpgsql;
+
+                CREATE TRIGGER reports_group_ids_insert
+                AFTER INSERT ON reports_report_groups
+                REFERENCING NEW TABLE AS new_rows
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION reports_report_groups_changed();
+
+                CREATE TRIGGER reports_group_ids_delete
+                AFTER DELETE ON reports_report_groups
+                REFERENCING OLD TABLE AS old_rows
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION reports_report_groups_changed();
+
+                UPDATE reports_report AS r
+                SET group_ids = groups.group_ids
+                FROM (
+                    SELECT report_id, array_agg(group_id ORDER BY group_id) AS group_ids
+                    FROM reports_report_groups
+                    GROUP BY report_id
+                ) AS groups
+                WHERE groups.report_id = r.id;
+            """,
+            reverse_sql="""
+                DROP TRIGGER IF EXISTS reports_group_ids_delete ON reports_report_groups;
+                DROP TRIGGER IF EXISTS reports_group_ids_insert ON reports_report_groups;
+                DROP FUNCTION IF EXISTS reports_report_groups_changed();
+                DROP FUNCTION IF EXISTS reports_update_group_ids(bigint[]);
+            """,
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['group_ids'], name='report_group_ids_gin'),
+        ),
+    ]
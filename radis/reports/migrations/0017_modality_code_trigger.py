@@ -0,0 +1,45 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:58
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0016_report_group_ids'),
+    ]
+
+    operations = [
+        # Keeps the modality codes of the reports in sync when a modality is renamed
+        # (see migration 0015). Transition tables can't be used together with a column
+        # list, so this is a row level trigger (renames are rare anyway).
+        migrations.RunSQL(
+            sql="""
+                CREATE OR REPLACE FUNCTION reports_modality_code_changed()
+                RETURNS trigger
+                AS $$
+                BEGIN
+                    PERFORM reports_update_modality_codes(
+                        ARRAY(
+                            SELECT report_id
+                            FROM reports_report_modalities
+                            WHERE modality_id = NEW.id
+                        )
+                    );
+                    RETURN NULL;
+                END
+                $$
+                LANGUAGE plpgsql;
+
+                CREATE TRIGGER reports_modality_codes_rename
+                AFTER UPDATE OF code ON reports_modality
+                FOR EACH ROW
+                WHEN (OLD.code IS DISTINCT FROM NEW.code)
+                EXECUTE FUNCTION reports_modality_code_changed();
+            """,
+            reverse_sql="""
+                DROP TRIGGER IF EXISTS reports_modality_codes_rename ON reports_modality;
+                DROP FUNCTION IF EXISTS reports_modality_code_changed();
+            """,
+        ),
+    ]
@@ -1,6 +1,10 @@
 from adit_radis_shared.common.models import AppSettings
 from django.contrib.auth.models import Group
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
 
 from radis.core.validators import (
     no_backslash_char_validator,
@@ -33,6 +37,13 @@ class Modality(models.Model):
         return self.code
 
 
+class ReportManager(models.Manager["Report"]):
+    def get_queryset(self) -> models.QuerySet["Report"]:
+        # The search vector is only used in database queries, there is no need to
+        # fetch it (it's as large as the body itself).
+        return super().get_queryset().defer("body_search_vector")
+
+
 class Report(models.Model):
     document_id = models.CharField(max_length=128, unique=True)
     language = models.ForeignKey(Language, on_delete=models.CASCADE, related_name="reports")
@@ -40,6 +51,10 @@ class Report(models.Model):
         Group,
         related_name="reports",
     )
+    # The IDs of the above groups, so that searches can be restricted to a group
+    # without joining the through table. It is maintained by database triggers on
+    # the through table (see migration 0016).
+    group_ids = ArrayField(models.IntegerField(), blank=True, default=list, editable=False)
     pacs_aet = models.CharField(max_length=16)
     pacs_name = models.CharField(max_length=64)
     pacs_link = models.CharField(max_length=200, blank=True)
@@ -71,15 +86,71 @@ class Report(models.Model):
     study_instance_uid = models.CharField(blank=True, max_length=64)
     accession_number = models.CharField(blank=True, max_length=32)
     modalities = models.ManyToManyField(Modality, related_name="reports")
+    # The (sorted) codes of the above modalities, so that reports can be filtered by
+    # modality without joining the through table. It is maintained by database
+    # triggers on the through table and the modalities (see migrations 0015 and 0017).
+    modality_codes = ArrayField(
+        models.CharField(max_length=16), blank=True, default=list, editable=False
+    )
     body = models.TextField()
+    # A hash over all the report data (see ReportSerializer) to detect if a
+    # report has really changed when it gets updated.
+    content_hash = models.CharField(max_length=64, blank=True, default="", editable=False)
+    # The full text search vector of the body in the report language. It is maintained
+    # by a database trigger (see the migrations of the pgsearch app).
+    body_search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     # body_en = models.TextField(blank=True)
     # body_de = models.TextField(blank=True)
 
+    objects = ReportManager()
+
     metadata: models.QuerySet["Metadata"]
 
+    class Meta:
+        base_manager_name = "objects"
+        indexes = [
+            GinIndex(fields=["body_search_vector"], name="report_body_search_vector_gin"),
+            # Indexes for the search filters (see SearchFilters)
+            GinIndex(fields=["group_ids"], name="report_group_ids_gin"),
+            GinIndex(fields=["modality_codes"], name="report_modality_codes_gin"),
+            # Supports the (case insensitive) partial matches of the study description
+            GinIndex(
+                OpClass(Upper("study_description"), name="gin_trgm_ops"),
+                name="report_study_description_trgm",
+            ),
+            models.Index(fields=["study_datetime"], name="report_study_datetime_idx"),
+            models.Index(
+                fields=["patient_sex", "patient_age", "study_datetime"],
+                name="report_sex_age_datetime_idx",
+            ),
+            models.Index(fields=["patient_id"], name="report_patient_id_idx"),
+        ]
+
+    # The fields that are maintained by the database (see above). The ORM must never
+    # write them, because the values of an instance may be outdated (e.g. the search
+    # vector of a just created report is not fetched back from the database).
+    DERIVED_FIELDS = ("body_search_vector", "group_ids", "modality_codes")
+
+    def save(self, *args, **kwargs) -> None:
+        if not self._state.adding:
+            update_fields = kwargs.get("update_fields")
+            if update_fields is None:
+                deferred_fields = self.get_deferred_fields()
+                update_fields = [
+                    field.name
+                    for field in self._meta.concrete_fields
+                    if not field.primary_key
+                    and not field.generated
+                    and field.attname not in deferred_fields
+                ]
+            kwargs["update_fields"] = [
+                name for name in update_fields if name not in self.DERIVED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     # def __str__(self) -> str:
     #    return f"Report {self.document_id} [{self.pk}]"
 
@@ -89,10 +160,6 @@ class Report(models.Model):
     #         setattr(self, body_language_field, self.body)
     #     super().save(*args, **kwargs)
 
-    @property
-    def modality_codes(self) -> list[str]:
-        return [modality.code for modality in self.modalities.all()]
-
 
 class Metadata(models.Model):
     report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name="metadata")
@@ -0,0 +1,26 @@
+import logging
+
+from procrastinate.contrib.django import app
+
+from .models import Report
+from .site import reports_created_handlers, reports_updated_handlers
+
+logger = logging.getLogger(__name__)
+
+
+@app.task
+def handle_reports_created(report_ids: list[int]) -> None:
+    reports = list(Report.objects.filter(pk__in=report_ids))
+    for handler in reports_created_handlers:
+        document_ids = [report.document_id for report in reports]
+        logger.debug(f"{handler.name} - handle newly created reports: {document_ids}")
+        handler.handle(reports)
+
+
+@app.task
+def handle_reports_updated(report_ids: list[int]) -> None:
+    reports = list(Report.objects.filter(pk__in=report_ids))
+    for handler in reports_updated_handlers:
+        document_ids = [report.document_id for report in reports]
+        logger.debug(f"{handler.name} - handle updated reports: {document_ids}")
+        handler.handle(reports)
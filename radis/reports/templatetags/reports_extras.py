@@ -14,4 +14,4 @@ def can_view_report(context: dict[str, Any], report: Report) -> bool:
     active_group = user.active_group
     if not active_group:
         return False
-    return report.groups.filter(pk=active_group.pk).exists()
+    return active_group.pk in report.group_ids
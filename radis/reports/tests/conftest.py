@@ -0,0 +1,44 @@
+from typing import Any, Callable
+
+import pytest
+from adit_radis_shared.accounts.factories import GroupFactory, UserFactory
+from django.contrib.auth.models import Group
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def report_group() -> Group:
+    return GroupFactory()
+
+
+@pytest.fixture
+def admin_api_client() -> APIClient:
+    client = APIClient()
+    client.force_authenticate(user=UserFactory(is_staff=True))
+    return client
+
+
+@pytest.fixture
+def report_data(report_group) -> Callable[..., dict[str, Any]]:
+    def _report_data(document_id: str, **kwargs: Any) -> dict[str, Any]:
+        return {
+            "document_id": document_id,
+            "language": "en",
+            "groups": [report_group.pk],
+            "pacs_aet": "RADIS",
+            "pacs_name": "RADIS PACS",
+            "pacs_link": "",
+            "patient_id": "1234567890",
+            "patient_birth_date": "1970-01-01",
+            "patient_sex": "F",
+            "study_description": "CT Thorax",
+            "study_datetime": "2024-01-01T12:00:00Z",
+            "study_instance_uid": "1.2.3.4",
+            "accession_number": "0815",
+            "modalities": ["CT"],
+            "metadata": {"series": "1"},
+            "body": "No pneumothorax.",
+            **kwargs,
+        }
+
+    return _report_data
@@ -0,0 +1,95 @@
+import gzip
+import json
+
+import pytest
+from django.urls import reverse
+
+from radis.reports.api.serializers import ReportSerializer
+from radis.reports.models import Report
+
+
+@pytest.mark.django_db
+def test_create_reports_in_bulk(admin_api_client, report_data, report_group):
+    response = admin_api_client.post(
+        reverse("report-list"), [report_data("doc-1"), report_data("doc-2")], format="json"
+    )
+
+    assert response.status_code == 201
+    reports = Report.objects.order_by("document_id")
+    assert [report.document_id for report in reports] == ["doc-1", "doc-2"]
+    for report in reports:
+        assert list(report.groups.all()) == [report_group]
+        assert [modality.code for modality in report.modalities.all()] == ["CT"]
+        assert {item.key: item.value for item in report.metadata.all()} == {"series": "1"}
+
+
+@pytest.mark.django_db
+def test_create_reports_in_bulk_rejects_existing_and_duplicate_document_ids(
+    admin_api_client, report_data
+):
+    response = admin_api_client.post(reverse("report-list"), [report_data("doc-1")], format="json")
+    assert response.status_code == 201
+
+    response = admin_api_client.post(
+        reverse("report-list"), [report_data("doc-1"), report_data("doc-2")], format="json"
+    )
+    assert response.status_code == 400
+
+    response = admin_api_client.post(
+        reverse("report-list"), [report_data("doc-2"), report_data("doc-2")], format="json"
+    )
+    assert response.status_code == 400
+
+    assert list(Report.objects.values_list("document_id", flat=True)) == ["doc-1"]
+
+
+@pytest.mark.django_db
+def test_upsert_reports_in_bulk(admin_api_client, report_data):
+    url = reverse("report-list") + "?upsert=true"
+    response = admin_api_client.post(url, [report_data("doc-1")], format="json")
+    assert response.status_code == 200
+
+    response = admin_api_client.post(
+        url,
+        [report_data("doc-1", body="Pneumothorax.", modalities=["MR"]), report_data("doc-2")],
+        format="json",
+    )
+    assert response.status_code == 200
+
+    updated = Report.objects.get(document_id="doc-1")
+    assert updated.body == "Pneumothorax."
+    assert [modality.code for modality in updated.modalities.all()] == ["MR"]
+    assert Report.objects.filter(document_id="doc-2").exists()
+
+
+@pytest.mark.django_db
+def test_upsert_relations_created_concurrently_are_ignored(report_data):
+    serializer = ReportSerializer(data=[report_data("doc-1")], many=True, context={"upsert": True})
+    serializer.is_valid(raise_exception=True)
+    serializer.upsert(serializer.validated_data)
+
+    # The relations of a concurrently created report already exist
+    report = Report.objects.get(document_id="doc-1")
+    relations = [(report, list(report.groups.all()), [], list(report.modalities.all()))]
+    serializer._create_relations(relations)
+
+    assert report.groups.count() == 1
+    assert report.modalities.count() == 1
+
+
+# The reports are created by database_sync_to_async, which doesn't work inside the
+# transaction of a regular database test.
+@pytest.mark.django_db(transaction=True)
+def test_stream_reports_ends_with_error_on_corrupt_body(admin_api_client):
+    body = gzip.compress(json.dumps({"document_id": "doc-1"}).encode() + b"\n")
+
+    response = admin_api_client.post(
+        reverse("report-stream"),
+        data=body[: len(body) // 2],
+        content_type="application/x-ndjson",
+        headers={"Content-Encoding": "gzip"},
+    )
+
+    assert response.status_code == 200
+    lines = b"".join(response).decode().splitlines()
+    assert "error" in json.loads(lines[-1])
@@ -6,6 +6,8 @@ class SearchConfig(AppConfig):
     name = "radis.search"
 
     def ready(self):
+        from . import signals as signals
+
         register_app()
 
         # Put calls to db stuff in this signal handler
@@ -15,6 +17,9 @@ class SearchConfig(AppConfig):
 def register_app():
     from adit_radis_shared.common.site import MainMenuItem, register_main_menu_item
 
+    from .providers import FEDERATED_SEARCH_PROVIDER_NAME, federated_search
+    from .site import SearchProvider, register_search_provider
+
     register_main_menu_item(
         MainMenuItem(
             url_name="search",
@@ -22,6 +27,15 @@ def register_app():
         )
     )
 
+    # Searches with all the other search providers at once
+    register_search_provider(
+        SearchProvider(
+            name=FEDERATED_SEARCH_PROVIDER_NAME,
+            search=federated_search,
+            max_results=1000,
+        )
+    )
+
 
 def init_db(**kwargs):
     from .models import SearchAppSettings
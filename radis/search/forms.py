@@ -8,6 +8,7 @@ from radis.core.constants import LANGUAGE_LABELS
 from radis.reports.models import Language, Modality
 
 from .layouts import QueryInput, RangeSlider
+from .providers import FEDERATED_SEARCH_PROVIDER_NAME
 from .site import search_providers
 
 MIN_AGE = 0
@@ -16,7 +17,13 @@ AGE_STEP = 10
 
 
 def get_search_providers():
-    return [(provider.name, provider.name) for provider in search_providers.values()]
+    # The federated search combines the other providers, so it's offered last (and
+    # is not the default provider)
+    providers = sorted(
+        search_providers.values(),
+        key=lambda provider: provider.name == FEDERATED_SEARCH_PROVIDER_NAME,
+    )
+    return [(provider.name, provider.name) for provider in providers]
 
 
 class SearchForm(forms.Form):
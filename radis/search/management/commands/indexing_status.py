@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from radis.search.utils.indexing_utils import get_indexing_lag
+
+
+class Command(BaseCommand):
+    help = "Shows how many reports are waiting to be indexed and for how long."
+
+    def handle(self, *args, **options):
+        pending, lag = get_indexing_lag()
+        self.stdout.write(f"Pending reports: {pending}")
+        self.stdout.write(f"Indexing lag: {lag}")
@@ -0,0 +1,141 @@
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from django import db
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import transaction
+from django.db.models import Max, Min
+
+from radis.reports.models import Report
+from radis.search.site import search_indexers
+from radis.search.utils.cache_utils import invalidate_search_cache
+
+
+def reindex_range(indexer_names: list[str], start_id: int, end_id: int) -> int:
+    """Reindex all reports in the ID range with the given indexers (runs in a worker)."""
+    num_reports = 0
+    with transaction.atomic():
+        for name in indexer_names:
+            num_reports = max(num_reports, search_indexers[name].reindex(start_id, end_id))
+    return num_reports
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the search indexes of all reports. The reports are processed in "
+        "batches of ID ranges by multiple worker processes."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        super().add_arguments(parser)
+
+        parser.add_argument(
+            "--indexer",
+            action="append",
+            dest="indexers",
+            default=None,
+            help="The name of the search indexer to use (can be used multiple times). "
+            "If not set then all registered indexers are used.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="The size of the report ID range that is reindexed at once (defaults to 10000).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="The number of worker processes. Defaults to the number of CPUs.",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            type=Path,
+            default=None,
+            help="A file where the progress is stored, so that an interrupted "
+            "reindex can be resumed (see --resume).",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Resume from the report ID stored in the checkpoint file.",
+        )
+
+    def handle(self, *args, **options):
+        indexer_names: list[str] = options["indexers"] or list(search_indexers.keys())
+        for name in indexer_names:
+            if name not in search_indexers:
+                raise CommandError(f"Unknown search indexer: {name}")
+
+        batch_size: int = options["batch_size"]
+        checkpoint: Path | None = options["checkpoint"]
+
+        stats = Report.objects.aggregate(min_id=Min("id"), max_id=Max("id"))
+        if stats["min_id"] is None:
+            self.stdout.write("No reports to reindex.")
+            return
+
+        start_id: int = stats["min_id"]
+        max_id: int = stats["max_id"]
+
+        if options["resume"]:
+            if checkpoint is None or not checkpoint.exists():
+                raise CommandError("Can't resume without an existing checkpoint file.")
+            state = json.loads(checkpoint.read_text())
+            if sorted(state["indexers"]) != sorted(indexer_names):
+                raise CommandError(
+                    f"The checkpoint is for other indexers: {', '.join(state['indexers'])}"
+                )
+            start_id = state["next_id"]
+
+        ranges = [
+            (range_start, min(range_start + batch_size, max_id + 1))
+            for range_start in range(start_id, max_id + 1, batch_size)
+        ]
+
+        self.stdout.write(
+            f"Reindexing reports {start_id} to {max_id} with {', '.join(indexer_names)} "
+            f"in {len(ranges)} batches using {options['workers']} workers..."
+        )
+
+        # Worker processes must not share the database connection of this process
+        db.connections.close_all()
+
+        completed: set[int] = set()
+        next_index = 0
+        num_reports = 0
+        start_time = time.time()
+        with ProcessPoolExecutor(
+            max_workers=options["workers"], mp_context=multiprocessing.get_context("fork")
+        ) as executor:
+            futures = {
+                executor.submit(reindex_range, indexer_names, range_start, range_end): index
+                for index, (range_start, range_end) in enumerate(ranges)
+            }
+            for future in as_completed(futures):
+                num_reports += future.result()
+                completed.add(futures[future])
+
+                # The checkpoint is the start of the first batch that is not done yet
+                while next_index in completed:
+                    next_index += 1
+                if checkpoint is not None:
+                    next_id = ranges[next_index][0] if next_index < len(ranges) else max_id + 1
+                    checkpoint.write_text(
+                        json.dumps({"indexers": indexer_names, "next_id": next_id})
+                    )
+
+                elapsed = time.time() - start_time
+                self.stdout.write(
+                    f"{len(completed)}/{len(ranges)} batches, {num_reports} reports "
+                    f"({num_reports / elapsed:.0f} reports/s)"
+                )
+
+        invalidate_search_cache()
+
+        self.stdout.write(f"Done (in {time.time() - start_time:.2f} seconds)")
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 13:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0002_pendingindexupdate"),
+    ]
+
+    operations = [
+        # The generation of the search result cache (see utils/cache_utils.py)
+        migrations.RunSQL(
+            sql="CREATE SEQUENCE IF NOT EXISTS search_cache_generation;",
+            reverse_sql="DROP SEQUENCE IF EXISTS search_cache_generation;",
+        ),
+    ]
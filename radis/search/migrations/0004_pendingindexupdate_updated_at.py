@@ -0,0 +1,20 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:42
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0003_search_cache_generation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pendingindexupdate",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
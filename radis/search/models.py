@@ -1,6 +1,9 @@
 import logging
 
 from adit_radis_shared.common.models import AppSettings
+from django.db import models
+
+from radis.reports.models import Report
 
 logger = logging.getLogger(__name__)
 
@@ -8,3 +11,17 @@ logger = logging.getLogger(__name__)
 class SearchAppSettings(AppSettings):
     class Meta:
         verbose_name_plural = "Search app settings"
+
+
+class PendingIndexUpdate(models.Model):
+    """A report that is queued to be (re)indexed by the search indexers."""
+
+    report_id: int
+    report = models.OneToOneField(Report, on_delete=models.CASCADE, related_name="+")
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped whenever the report is queued again, so that an indexing worker
+    # doesn't dequeue a report that changed while it was indexed.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"PendingIndexUpdate of report {self.report_id} [{self.pk}]"
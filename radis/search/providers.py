@@ -0,0 +1,103 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.db import connection
+
+from .site import (
+    ReportDocument,
+    Search,
+    SearchProvider,
+    SearchResult,
+    TotalRelation,
+    search_providers,
+)
+
+logger = logging.getLogger(__name__)
+
+FEDERATED_SEARCH_PROVIDER_NAME = "Federated Search"
+
+
+def _get_federated_providers() -> list[SearchProvider]:
+    names = settings.SEARCH_FEDERATED_PROVIDERS
+    if names is None:
+        names = [name for name in search_providers if name != FEDERATED_SEARCH_PROVIDER_NAME]
+    return [search_providers[name] for name in names]
+
+
+def _search_in_thread(provider: SearchProvider, search: Search) -> SearchResult:
+    try:
+        return provider.search(search)
+    finally:
+        # Each thread gets its own database connection, which must not be leaked
+        connection.close()
+
+
+def federated_search(search: Search) -> SearchResult:
+    """Search with multiple search providers at the same time and merge their results.
+
+    The results are merged with reciprocal rank fusion and deduplicated by their
+    document ID. Providers that fail or don't respond within the timeout are
+    skipped. Cursors are not supported as they are specific to a provider.
+    """
+    if search.cursor is not None:
+        raise ValueError("The federated search does not support cursors.")
+
+    providers = _get_federated_providers()
+
+    # Each provider must return all the results up to the requested page, as the
+    # fused ranks can differ from the ranks of the single providers.
+    provider_search = search._replace(
+        offset=0, limit=None if search.limit is None else search.offset + search.limit
+    )
+
+    results: list[SearchResult] = []
+    executor = ThreadPoolExecutor(max_workers=len(providers) or 1)
+    try:
+        futures = {
+            executor.submit(_search_in_thread, provider, provider_search): provider
+            for provider in providers
+        }
+        done, not_done = wait(futures, timeout=settings.SEARCH_FEDERATED_TIMEOUT)
+        for future in not_done:
+            logger.warning("%s - search timed out", futures[future].name)
+        for future in done:
+            try:
+                results.append(future.result())
+            except Exception:
+                logger.exception("%s - search failed", futures[future].name)
+    finally:
+        # Don't wait for the providers that timed out
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    scores: dict[str, float] = {}
+    documents: dict[str, ReportDocument] = {}
+    for result in results:
+        for rank, document in enumerate(result.documents, start=1):
+            scores[document.document_id] = scores.get(document.document_id, 0.0) + 1.0 / (
+                settings.SEARCH_FEDERATED_RRF_K + rank
+            )
+            documents.setdefault(document.document_id, document)
+
+    fused = sorted(documents.values(), key=lambda document: -scores[document.document_id])
+    if search.limit is None:
+        fused = fused[search.offset :]
+    else:
+        fused = fused[search.offset : search.offset + search.limit]
+
+    # The union of the results is at least as large as the largest result. The
+    # relation is the weakest one of the providers, as an estimated count stays an
+    # estimate when combined with others.
+    total_count = max((result.total_count for result in results), default=0)
+    relations = {result.total_relation for result in results}
+    total_relation: TotalRelation = "exact"
+    if "approximately" in relations:
+        total_relation = "approximately"
+    elif "at_least" in relations or (len(results) > 1 and total_count > 0):
+        total_relation = "at_least"
+
+    return SearchResult(
+        total_count=total_count,
+        total_relation=total_relation,
+        documents=[document._replace(relevance=scores[document.document_id]) for document in fused],
+    )
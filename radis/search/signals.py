@@ -0,0 +1,45 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from radis.reports.models import Modality, Report
+
+from .utils.cache_utils import invalidate_search_cache_on_commit
+from .utils.indexing_utils import enqueue_reports
+
+
+@receiver(post_save, sender=Report)
+def enqueue_report_for_indexing(sender, instance, **kwargs):
+    enqueue_reports([instance.pk])
+
+
+@receiver(m2m_changed, sender=Report.groups.through)
+@receiver(m2m_changed, sender=Report.modalities.through)
+def enqueue_reports_with_changed_relations_for_indexing(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    # The relations can be changed from both sides, e.g. report.groups.add(group) or
+    # group.reports.add(report). In the latter case the instance is the group (or
+    # modality) and pk_set contains the IDs of the reports.
+    if not reverse:
+        if action == "post_clear" or (action in ("post_add", "post_remove") and pk_set):
+            enqueue_reports([instance.pk])
+    elif action in ("post_add", "post_remove") and pk_set:
+        enqueue_reports(pk_set)
+    elif action == "pre_clear":
+        # The cleared reports are unknown afterwards
+        enqueue_reports(instance.reports.values_list("pk", flat=True))
+
+
+@receiver(pre_save, sender=Modality)
+def enqueue_reports_of_renamed_modality_for_indexing(sender, instance, **kwargs):
+    # The modality codes of the reports are updated by a database trigger, but the
+    # search indexers keep their own copy of them.
+    if instance.pk is None:
+        return
+    if Modality.objects.filter(pk=instance.pk).exclude(code=instance.code).exists():
+        enqueue_reports(instance.reports.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Report)
+def invalidate_search_cache_of_deleted_report(sender, instance, **kwargs):
+    invalidate_search_cache_on_commit()
@@ -16,16 +16,60 @@ class ReportDocument(NamedTuple):
     study_description: str
     modalities: list[str]
     summary: str
+    # The report itself if the search provider already fetched it (saves a query per
+    # document when rendering the results)
+    report: Report | None = None
 
     @property
     def full_report(self) -> Report:
+        if self.report is not None:
+            return self.report
         return Report.objects.get(document_id=self.document_id)
 
 
+class SearchCursor(NamedTuple):
+    """A position in the ranked results of a search (used for keyset pagination).
+
+    The results of a search are ordered by rank (descending) and then by ID (descending),
+    so a cursor of the last result of a page is enough to fetch the next page.
+
+    Attributes:
+    - rank: The rank of the last result.
+    - id: The (provider specific) ID of the last result.
+    """
+
+    rank: float
+    id: int
+
+    def encode(self) -> str:
+        """Encode the cursor as an opaque string (e.g. for a URL parameter)."""
+        return f"{self.rank!r}:{self.id}"
+
+    @classmethod
+    def decode(cls, value: str) -> "SearchCursor":
+        """Decode a cursor string. Raises a ValueError if it's invalid."""
+        rank, id = value.split(":")
+        return cls(rank=float(rank), id=int(id))
+
+
+TotalRelation = Literal["exact", "at_least", "approximately"]
+
+
 class SearchResult(NamedTuple):
+    """A class representing the result of a search.
+
+    Attributes:
+    - total_count: The total count of the results (see total_relation).
+    - total_relation: How the total count relates to the real number of results.
+    - documents: The documents of the requested page.
+    - next_cursor: The cursor to fetch the page after this one, or None if this
+        was the last page.
+    """
+
     total_count: int
-    total_relation: Literal["exact", "at_least", "approximately"]
+    total_relation: TotalRelation
     documents: list[ReportDocument]
+    next_cursor: SearchCursor | None = None
 
 
 @dataclass
@@ -59,6 +103,9 @@ class SearchFilters:
     created_before: datetime | None = None
 
 
+CountStrategy = Literal["exact", "capped", "estimated"]
+
+
 class Search(NamedTuple):
     """A class representing a search.
 
@@ -70,12 +117,24 @@ class Search(NamedTuple):
     - filters: The filters to apply to the search.
     - offset: The offset of the search results.
     - limit: The size limit of the search results.
+    - count_strategy: How the total count of the results is determined. "exact" counts
+        all results, "capped" counts at most count_limit results and "estimated" uses
+        the estimate of the query planner.
+    - count_limit: The maximum number of results that are counted (for the "capped" and
+        "estimated" strategies).
+    - cursor: Only return results ranked after this cursor (keyset pagination). It
+        can't be combined with an offset (other than 0). Unlike an offset the database
+        doesn't have to rank and skip all the earlier results, so deep pages are as
+        cheap as the first one.
     """
 
     query: QueryNode
     filters: SearchFilters
     offset: int = 0
     limit: int | None = 10
+    count_strategy: CountStrategy = "exact"
+    count_limit: int | None = None
+    cursor: SearchCursor | None = None
 
 
 class SearchProvider(NamedTuple):
@@ -99,3 +158,31 @@ search_providers: dict[str, SearchProvider] = {}
 def register_search_provider(search_provider: SearchProvider) -> None:
     """Register a search provider."""
     search_providers[search_provider.name] = search_provider
+
+
+class SearchIndexer(NamedTuple):
+    """A class representing a search indexer.
+
+    Search indexers are called by the indexing queue (see utils/indexing_utils.py)
+    whenever reports were created or updated, and by the reindex command.
+
+    Attributes:
+    - name: The name of the search indexer.
+    - index: The function that (re)indexes the given reports in bulk, or None if
+        the index is kept up to date by the database itself.
+    - reindex: The function that rebuilds the index for all reports with an ID in
+        the given range (start inclusive, end exclusive). Returns the number of
+        reindexed reports.
+    """
+
+    name: str
+    index: Callable[[list[Report]], None] | None
+    reindex: Callable[[int, int], int]
+
+
+search_indexers: dict[str, SearchIndexer] = {}
+
+
+def register_search_indexer(search_indexer: SearchIndexer) -> None:
+    """Register a search indexer."""
+    search_indexers[search_indexer.name] = search_indexer
@@ -0,0 +1,25 @@
+import logging
+
+from django.conf import settings
+from procrastinate.contrib.django import app
+
+from .utils.indexing_utils import get_indexing_lag, index_pending_reports
+
+logger = logging.getLogger(__name__)
+
+
+@app.task(queueing_lock="index_reports")
+def index_reports() -> None:
+    num_indexed = index_pending_reports()
+    logger.info("Indexed %d reports.", num_indexed)
+
+
+@app.periodic(cron=settings.SEARCH_INDEXING_CRON)
+@app.task
+def index_reports_sweeper(timestamp: int) -> None:
+    # Picks up reports that were queued but whose indexing job got lost
+    # (e.g. because the process died before it could be deferred).
+    pending, lag = get_indexing_lag()
+    if pending > 0:
+        logger.info("Indexing %d pending reports (lag %s).", pending, lag)
+        index_pending_reports()
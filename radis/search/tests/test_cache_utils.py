@@ -0,0 +1,37 @@
+import pytest
+from adit_radis_shared.accounts.factories import GroupFactory
+from django.core.cache import caches
+from django.db import connection
+
+from radis.pgsearch.providers import search
+from radis.reports.factories import LanguageFactory, ReportFactory
+from radis.search.site import Search, SearchFilters, SearchProvider
+from radis.search.utils.cache_utils import cached_search
+from radis.search.utils.query_parser import QueryParser
+
+
+@pytest.mark.django_db
+def test_cached_search_is_invalidated_by_new_reports(django_capture_on_commit_callbacks):
+    caches["search"].clear()
+    # Like a freshly created sequence
+    with connection.cursor() as cursor:
+        cursor.execute("ALTER SEQUENCE search_cache_generation RESTART")
+
+    group = GroupFactory()
+    language = LanguageFactory(code="en")
+    provider = SearchProvider(name="pgsearch", search=search, max_results=100)
+    query_node, _ = QueryParser().parse("pneumothorax")
+    assert query_node is not None
+    pneumothorax_search = Search(
+        query=query_node, filters=SearchFilters(group=group.pk, language="en")
+    )
+
+    assert cached_search(provider, pneumothorax_search).total_count == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ReportFactory.create(language=language, body="Pneumothorax.").groups.add(group)
+    assert cached_search(provider, pneumothorax_search).total_count == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ReportFactory.create(language=language, body="Pneumothorax.").groups.add(group)
+    assert cached_search(provider, pneumothorax_search).total_count == 2
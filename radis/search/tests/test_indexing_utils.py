@@ -0,0 +1,159 @@
+from datetime import timedelta
+
+import pytest
+from adit_radis_shared.accounts.factories import GroupFactory
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from radis.reports.factories import ReportFactory
+from radis.reports.models import Report
+from radis.search.models import PendingIndexUpdate
+from radis.search.site import SearchIndexer
+from radis.search.utils.indexing_utils import (
+    enqueue_reports,
+    get_indexed_until,
+    get_indexing_lag,
+    index_pending_reports,
+)
+
+
+@pytest.fixture
+def indexed_batches(monkeypatch) -> list[list[int]]:
+    """Replaces the search indexers by one that records the IDs of the indexed reports."""
+    batches: list[list[int]] = []
+
+    def index(reports: list[Report]) -> None:
+        batches.append(sorted(report.pk for report in reports))
+
+    indexer = SearchIndexer(name="test", index=index, reindex=lambda start, end: 0)
+    monkeypatch.setattr("radis.search.utils.indexing_utils.search_indexers", {"test": indexer})
+    return batches
+
+
+def queued_report_ids() -> list[int]:
+    return list(
+        PendingIndexUpdate.objects.order_by("report_id").values_list("report_id", flat=True)
+    )
+
+
+@pytest.mark.django_db
+def test_enqueue_reports_coalesces_changes_until_commit(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        report = ReportFactory.create()
+        report.pacs_name = "Other PACS"
+        report.save()
+        enqueue_reports([report.pk])
+
+        assert queued_report_ids() == []
+
+    assert queued_report_ids() == [report.pk]
+
+
+@pytest.mark.django_db
+def test_enqueue_reports_skips_rolled_back_reports(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        report = ReportFactory.create()
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                ReportFactory.create()
+                raise RuntimeError()
+
+    assert queued_report_ids() == [report.pk]
+
+
+@pytest.mark.django_db
+def test_enqueue_reports_when_groups_change(django_capture_on_commit_callbacks):
+    group = GroupFactory()
+    with django_capture_on_commit_callbacks(execute=True):
+        report = ReportFactory.create()
+    PendingIndexUpdate.objects.all().delete()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        report.groups.add(group)
+    assert queued_report_ids() == [report.pk]
+    PendingIndexUpdate.objects.all().delete()
+
+    # Changed from the other side of the relation (like in the group admin)
+    with django_capture_on_commit_callbacks(execute=True):
+        group.reports.clear()  # type: ignore
+    assert queued_report_ids() == [report.pk]
+
+
+@pytest.mark.django_db
+def test_index_pending_reports_empties_queue(indexed_batches, settings):
+    settings.SEARCH_INDEXING_BATCH_SIZE = 2
+    reports = ReportFactory.create_batch(3)
+    PendingIndexUpdate.objects.bulk_create(
+        [PendingIndexUpdate(report=report) for report in reports]
+    )
+
+    assert index_pending_reports() == 3
+
+    assert indexed_batches == [[reports[0].pk, reports[1].pk], [reports[2].pk]]
+    assert queued_report_ids() == []
+
+
+@pytest.mark.django_db
+def test_index_pending_reports_keeps_reports_queued_again_while_indexed(monkeypatch):
+    report = ReportFactory.create()
+    PendingIndexUpdate.objects.create(report=report)
+    indexed: list[int] = []
+
+    def index(reports: list[Report]) -> None:
+        if not indexed:
+            # The report is changed (and queued again) while it is indexed
+            PendingIndexUpdate.objects.filter(report=report).update(
+                updated_at=F("updated_at") + timedelta(seconds=1)
+            )
+        indexed.extend(report.pk for report in reports)
+
+    indexer = SearchIndexer(name="test", index=index, reindex=lambda start, end: 0)
+    monkeypatch.setattr("radis.search.utils.indexing_utils.search_indexers", {"test": indexer})
+
+    assert index_pending_reports() == 2
+
+    assert indexed == [report.pk, report.pk]
+    assert queued_report_ids() == []
+
+
+@pytest.mark.django_db
+def test_get_indexing_lag():
+    assert get_indexing_lag() == (0, timedelta())
+
+    report = ReportFactory.create()
+    PendingIndexUpdate.objects.create(report=report)
+    PendingIndexUpdate.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+
+    pending, lag = get_indexing_lag()
+    assert pending == 1
+    assert lag >= timedelta(minutes=5)
+
+
+@pytest.mark.django_db
+def test_get_indexed_until_stops_at_oldest_queued_report():
+    created_after = timezone.now() - timedelta(days=1)
+    _, queued_report = ReportFactory.create_batch(2)
+    assert get_indexed_until(created_after) >= queued_report.created_at
+
+    PendingIndexUpdate.objects.create(report=queued_report)
+
+    assert get_indexed_until(created_after) == queued_report.created_at
+
+
+@pytest.mark.django_db
+def test_enqueue_reports_when_modality_is_renamed(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        report = ReportFactory.create(modalities=["CT"])
+    PendingIndexUpdate.objects.all().delete()
+    modality = report.modalities.get()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        modality.filterable = False
+        modality.save()
+    assert queued_report_ids() == []
+
+    with django_capture_on_commit_callbacks(execute=True):
+        modality.code = "CR"
+        modality.save()
+    assert queued_report_ids() == [report.pk]
@@ -0,0 +1,136 @@
+import threading
+
+import pytest
+
+from radis.search.providers import federated_search
+from radis.search.site import (
+    ReportDocument,
+    Search,
+    SearchFilters,
+    SearchProvider,
+    SearchResult,
+    TotalRelation,
+)
+from radis.search.utils.query_parser import QueryParser
+
+
+def create_document(document_id: str) -> ReportDocument:
+    return ReportDocument(
+        relevance=None,
+        document_id=document_id,
+        pacs_name="PACS",
+        pacs_link="",
+        patient_age=42,
+        patient_sex="F",
+        study_description="",
+        modalities=[],
+        summary="",
+    )
+
+
+def create_provider(
+    name: str, document_ids: list[str], total_relation: TotalRelation = "exact"
+) -> SearchProvider:
+    def search(search: Search) -> SearchResult:
+        documents = [create_document(document_id) for document_id in document_ids]
+        if search.limit is not None:
+            documents = documents[: search.limit]
+        return SearchResult(
+            total_count=len(document_ids), total_relation=total_relation, documents=documents
+        )
+
+    return SearchProvider(name=name, search=search, max_results=100)
+
+
+def create_failing_provider(name: str) -> SearchProvider:
+    def search(search: Search) -> SearchResult:
+        raise RuntimeError("Search failed")
+
+    return SearchProvider(name=name, search=search, max_results=100)
+
+
+def create_search(offset: int = 0, limit: int | None = 10) -> Search:
+    query_node, _ = QueryParser().parse("pneumothorax")
+    assert query_node is not None
+    return Search(query=query_node, filters=SearchFilters(group=1), offset=offset, limit=limit)
+
+
+@pytest.fixture
+def register_providers(monkeypatch, settings):
+    def register(*providers: SearchProvider) -> None:
+        monkeypatch.setattr(
+            "radis.search.providers.search_providers",
+            {provider.name: provider for provider in providers},
+        )
+        settings.SEARCH_FEDERATED_PROVIDERS = None
+
+    return register
+
+
+def test_federated_search_fuses_ranks_and_deduplicates(register_providers):
+    register_providers(
+        create_provider("first", ["a", "b", "c"]),
+        create_provider("second", ["c", "a"]),
+    )
+
+    result = federated_search(create_search())
+
+    # a (ranks 1 and 2) and c (ranks 3 and 1) are found by both providers
+    assert [document.document_id for document in result.documents] == ["a", "c", "b"]
+    relevances = [document.relevance for document in result.documents]
+    assert relevances == sorted(relevances, reverse=True)
+    assert result.total_count == 3
+    assert result.total_relation == "at_least"
+
+
+def test_federated_search_slices_the_fused_results(register_providers):
+    register_providers(
+        create_provider("first", ["a", "b", "c"]),
+        create_provider("second", ["c", "a"]),
+    )
+
+    result = federated_search(create_search(offset=1, limit=2))
+
+    assert [document.document_id for document in result.documents] == ["c", "b"]
+
+
+def test_federated_search_skips_failing_providers(register_providers):
+    register_providers(create_provider("first", ["a", "b"]), create_failing_provider("second"))
+
+    result = federated_search(create_search())
+
+    assert [document.document_id for document in result.documents] == ["a", "b"]
+    assert result.total_count == 2
+    assert result.total_relation == "exact"
+
+
+def test_federated_search_skips_providers_that_time_out(register_providers, settings):
+    settings.SEARCH_FEDERATED_TIMEOUT = 0.1
+    released = threading.Event()
+
+    def search(search: Search) -> SearchResult:
+        released.wait(timeout=10)
+        return SearchResult(total_count=1, total_relation="exact", documents=[create_document("x")])
+
+    register_providers(
+        create_provider("first", ["a"]), SearchProvider(name="slow", search=search, max_results=100)
+    )
+
+    try:
+        result = federated_search(create_search())
+    finally:
+        released.set()
+
+    assert [document.document_id for document in result.documents] == ["a"]
+
+
+def test_federated_search_propagates_the_weakest_total_relation(register_providers):
+    register_providers(
+        create_provider("first", ["a", "b"]),
+        create_provider("second", ["c"], total_relation="approximately"),
+    )
+
+    result = federated_search(create_search())
+
+    assert result.total_count == 2
+    assert result.total_relation == "approximately"
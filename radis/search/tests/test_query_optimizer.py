@@ -0,0 +1,45 @@
+from radis.search.utils.query_optimizer import optimize_query
+from radis.search.utils.query_parser import QueryParser
+
+
+def optimize(query: str) -> str:
+    node, _ = QueryParser().parse(query)
+    assert node is not None
+    return QueryParser.unparse(optimize_query(node))
+
+
+def test_flatten_chains():
+    assert optimize("foo AND (bar AND baz)") == "bar AND baz AND foo"
+    assert optimize("(foo OR bar) OR (baz OR qux)") == "foo OR bar OR baz OR qux"
+
+
+def test_remove_duplicates():
+    assert optimize("foo foo") == "foo"
+    assert optimize("foo OR bar OR foo") == "foo OR bar"
+    assert optimize("(foo OR bar) AND (foo OR bar)") == "foo OR bar"
+
+
+def test_fold_double_negations():
+    assert optimize("NOT NOT foo") == "foo"
+    assert optimize("NOT (NOT foo)") == "foo"
+    assert optimize("NOT NOT NOT foo") == "NOT foo"
+
+
+def test_remove_redundant_parens():
+    assert optimize("(foo)") == "foo"
+    assert optimize("((foo bar))") == "bar AND foo"
+    assert optimize("NOT (foo)") == "NOT foo"
+
+    # Parentheses that are needed because of the operator precedence are kept
+    assert optimize("foo AND (bar OR baz)") == "foo AND (bar OR baz)"
+    assert optimize("NOT (foo OR bar)") == "NOT (foo OR bar)"
+    assert optimize("NOT (foo bar)") == "NOT (bar AND foo)"
+
+
+def test_order_conjuncts():
+    assert optimize('NOT foo (bar OR baz) qux "foo bar" pneumothorax') == (
+        '"foo bar" AND pneumothorax AND qux AND (bar OR baz) AND NOT foo'
+    )
+
+    # Equivalent queries result in the same optimized query
+    assert optimize("foo bar") == optimize("bar AND foo")
@@ -138,3 +138,20 @@ def test_empty_queries():
     assert is_empty_query("( AND )", 2)
     assert is_empty_query("( AND OR )", 3)
     assert is_empty_query("AND OR )", 3)
+
+
+def test_cached_queries():
+    node1, fixes1 = QueryParser().parse("foo AND AND bar")
+    node2, fixes2 = QueryParser().parse("foo AND AND bar")
+    assert node1 is node2
+    assert fixes1 == fixes2 == ["Fixed invalid consecutive operators"]
+
+    # The fixes are copied, so modifying them doesn't affect the cache
+    fixes1.clear()
+    _, fixes3 = QueryParser().parse("foo AND AND bar")
+    assert fixes3 == ["Fixed invalid consecutive operators"]
+
+
+def test_fixes_in_multiple_segments():
+    assert is_fixed_query('(AND foo) "bar" (OR baz NOT)', '(foo) "bar" (baz)', 2)
+    assert is_fixed_query('"foo"  AND OR  "bar"', '"foo" AND "bar"', 1)
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import threading
+from dataclasses import asdict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+
+from ..site import Search, SearchProvider, SearchResult
+from .query_optimizer import optimize_query
+from .query_parser import QueryParser
+
+_pending = threading.local()
+
+
+def get_cache_generation() -> int:
+    """Returns the current generation of the search cache.
+
+    The generation is kept in a database sequence (see the migrations), so that it
+    is shared by all processes, even if the cache itself is not.
+    """
+    with connection.cursor() as cursor:
+        # A new sequence already has a last value (its start value), but it is only
+        # returned by the first nextval. So it's not a generation before that.
+        cursor.execute(
+            "SELECT CASE WHEN is_called THEN last_value ELSE 0 END FROM search_cache_generation"
+        )
+        return cursor.fetchone()[0]
+
+
+def invalidate_search_cache() -> None:
+    """Invalidates all cached search results by starting a new cache generation.
+
+    Must be called after the changes to the reports were committed (otherwise a
+    concurrent search could cache the old results for the new generation).
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT nextval('search_cache_generation')")
+
+
+def invalidate_search_cache_on_commit() -> None:
+    """Invalidates the search cache when the current transaction is committed.
+
+    Multiple calls within one transaction only invalidate the cache once.
+    """
+    _pending.invalidate = True
+    # Registered for each call, as Django silently discards the callbacks of rolled
+    # back savepoints (see enqueue_reports)
+    transaction.on_commit(_invalidate_pending)
+
+
+def _invalidate_pending() -> None:
+    if getattr(_pending, "invalidate", False):
+        _pending.invalidate = False
+        invalidate_search_cache()
+
+
+def _build_cache_key(provider: SearchProvider, search: Search) -> str:
+    filters = asdict(search.filters)
+    filters["modalities"] = sorted(filters["modalities"])
+    data = {
+        "generation": get_cache_generation(),
+        "provider": provider.name,
+        # Equivalent queries share the same cache entry
+        "query": QueryParser.unparse(optimize_query(search.query)),
+        "filters": filters,
+        "offset": search.offset,
+        "limit": search.limit,
+        "count_strategy": search.count_strategy,
+        "count_limit": search.count_limit,
+        "cursor": search.cursor,
+    }
+    content = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return f"search:{hashlib.sha256(content.encode()).hexdigest()}"
+
+
+def cached_search(provider: SearchProvider, search: Search) -> SearchResult:
+    """Search with the provider and cache the result (see SEARCH_CACHE_ALIAS).
+
+    The cached results expire after the timeout of the cache and are invalidated
+    whenever reports are created, updated, deleted or indexed.
+    """
+    if settings.SEARCH_CACHE_ALIAS is None:
+        return provider.search(search)
+
+    cache = caches[settings.SEARCH_CACHE_ALIAS]
+    key = _build_cache_key(provider, search)
+    result: SearchResult | None = cache.get(key)
+    if result is None:
+        result = provider.search(search)
+        cache.set(key, result)
+    return result
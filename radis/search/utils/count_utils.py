@@ -0,0 +1,39 @@
+import json
+
+from django.db import connections
+from django.db.models import QuerySet
+
+from ..site import Search, TotalRelation
+
+
+def count_results(queryset: QuerySet, search: Search) -> tuple[int, TotalRelation]:
+    """Count the results of a search queryset according to the count strategy of the search.
+
+    Returns: The total count and how it relates to the real number of results.
+    """
+    queryset = queryset.order_by()
+
+    if search.count_strategy == "estimated":
+        estimate = estimate_count(queryset)
+        # The planner estimate is rather useless for small result sets, so we count those
+        if search.count_limit is None or estimate >= search.count_limit:
+            return estimate, "approximately"
+
+    if search.count_strategy != "exact" and search.count_limit is not None:
+        # Counts in a LIMITed subquery, so the database can stop early
+        count = queryset[: search.count_limit].count()
+        return count, "at_least" if count >= search.count_limit else "exact"
+
+    return queryset.count(), "exact"
+
+
+def estimate_count(queryset: QuerySet) -> int:
+    """Returns the number of rows the query planner estimates for the queryset."""
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
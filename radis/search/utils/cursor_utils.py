@@ -0,0 +1,36 @@
+from typing import Any, Sequence
+
+from django.db.models import FloatField, Func, Q, QuerySet, Value
+
+from ..site import SearchCursor
+
+
+class _Real(Func):
+    # The rank of a full text search is a real (float4). Comparing it with the rank of
+    # a cursor as a double would never find the results with the same rank, as the
+    # rank can't be exactly represented as a double.
+    template = "CAST(%(expressions)s AS real)"
+    output_field = FloatField()
+
+
+def filter_after_cursor(queryset: QuerySet, cursor: SearchCursor | None) -> QuerySet:
+    """Filter a queryset to the results that are ranked after the cursor.
+
+    The queryset must have a rank annotation and be ordered by rank and primary
+    key (both descending).
+    """
+    if cursor is None:
+        return queryset
+    rank = _Real(Value(cursor.rank))
+    return queryset.filter(Q(rank__lt=rank) | Q(rank=rank, pk__lt=cursor.id))
+
+
+def get_next_cursor(page: Sequence[Any], limit: int | None) -> SearchCursor | None:
+    """Returns the cursor of the page after the given (rank annotated) page of results.
+
+    If the page is not full, then there are no more results and None is returned.
+    """
+    if limit is None or not page or len(page) < limit:
+        return None
+    last = page[-1]
+    return SearchCursor(rank=last.rank, id=last.pk)
@@ -0,0 +1,148 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Iterable, NamedTuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+from procrastinate.contrib.django import app
+from procrastinate.exceptions import AlreadyEnqueued
+
+from radis.reports.models import Report
+
+from ..models import PendingIndexUpdate
+from ..site import search_indexers
+from .cache_utils import invalidate_search_cache
+
+logger = logging.getLogger(__name__)
+
+_pending = threading.local()
+
+
+def enqueue_reports(report_ids: Iterable[int]) -> None:
+    """Queue reports to be (re)indexed by all registered search indexers.
+
+    The IDs are collected until the current transaction is committed and are then
+    written to the indexing queue in one go. So saving many reports in one transaction
+    only costs one insert into the queue and one deferred indexing job.
+    """
+    if not hasattr(_pending, "report_ids"):
+        _pending.report_ids = set()
+    _pending.report_ids.update(report_ids)
+
+    # A flush is registered for each call (instead of remembering that one is already
+    # scheduled), because Django silently discards the callbacks of a rolled back
+    # transaction or savepoint. All but the first flush after a commit find nothing
+    # to do. IDs of rolled back reports are filtered out when flushing.
+    transaction.on_commit(_flush_pending_reports)
+
+
+def _flush_pending_reports() -> None:
+    report_ids: set[int] = _pending.report_ids
+    if not report_ids:
+        return
+    _pending.report_ids = set()
+
+    # Some of the reports could be gone in the meantime (or were
+    # created in a savepoint or transaction that was rolled back).
+    # Reports that are already queued are only marked as changed again. If such a
+    # report is just being indexed, the update waits until the indexing worker is done
+    # (and then queues it anew, if the worker dequeued it in the meantime). The IDs are
+    # sorted so that concurrent flushes lock the rows in the same order.
+    existing_ids = (
+        Report.objects.filter(pk__in=report_ids).order_by("pk").values_list("pk", flat=True)
+    )
+    PendingIndexUpdate.objects.bulk_create(
+        [PendingIndexUpdate(report_id=report_id) for report_id in existing_ids],
+        update_conflicts=True,
+        unique_fields=["report"],
+        update_fields=["updated_at"],
+    )
+
+    # The database triggers (e.g. of pgsearch) already changed the search results,
+    # so we can't wait for the indexing job to invalidate the cached ones.
+    invalidate_search_cache()
+
+    defer_indexing()
+
+
+def defer_indexing() -> None:
+    """Defer a job that processes the indexing queue (if there is not already one)."""
+    try:
+        app.configure_task(
+            "radis.search.tasks.index_reports",
+            allow_unknown=False,
+            queueing_lock="index_reports",
+        ).defer()
+    except AlreadyEnqueued:
+        pass
+
+
+def index_pending_reports() -> int:
+    """Index the queued reports in batches until the queue is empty.
+
+    Can safely be called by multiple workers at the same time as each batch is
+    locked while it gets indexed.
+
+    Returns: The number of indexed reports.
+    """
+    num_indexed = 0
+    while True:
+        with transaction.atomic():
+            pending = list(
+                PendingIndexUpdate.objects.select_for_update(skip_locked=True).order_by("id")[
+                    : settings.SEARCH_INDEXING_BATCH_SIZE
+                ]
+            )
+            if not pending:
+                return num_indexed
+
+            reports = list(
+                Report.objects.select_related("language").filter(
+                    pk__in=[item.report_id for item in pending]
+                )
+            )
+            for indexer in search_indexers.values():
+                if indexer.index is None:
+                    continue
+                logger.debug("%s - index %d reports", indexer.name, len(reports))
+                indexer.index(reports)
+
+            # Reports that were queued again while being indexed stay in the queue
+            indexed = Q()
+            for item in pending:
+                indexed |= Q(pk=item.pk, updated_at__lte=item.updated_at)
+            PendingIndexUpdate.objects.filter(indexed).delete()
+
+        # The reports are now searchable by the indexers, so cached results may be outdated
+        invalidate_search_cache()
+
+        num_indexed += len(pending)
+
+
+def get_indexed_until(created_after: datetime) -> datetime:
+    """Returns the point in time until which all reports created after the given time
+    are indexed by the search indexers (as far as they were committed).
+
+    The indexing happens asynchronously, so new reports that are still queued for
+    indexing can't be found yet.
+    """
+    now = timezone.now()
+    oldest = PendingIndexUpdate.objects.filter(report__created_at__gte=created_after).aggregate(
+        oldest=Min("report__created_at")
+    )["oldest"]
+    return min(now, oldest) if oldest else now
+
+
+class IndexingLag(NamedTuple):
+    pending: int
+    lag: timedelta
+
+
+def get_indexing_lag() -> IndexingLag:
+    """Returns the number of queued reports and how long the oldest one is waiting."""
+    stats = PendingIndexUpdate.objects.aggregate(pending=Count("id"), oldest=Min("created_at"))
+    lag = timezone.now() - stats["oldest"] if stats["oldest"] else timedelta()
+    return IndexingLag(pending=stats["pending"], lag=lag)
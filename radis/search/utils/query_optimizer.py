@@ -0,0 +1,73 @@
+from .query_parser import BinaryNode, ParensNode, QueryNode, QueryParser, TermNode, UnaryNode
+
+
+def optimize_query(node: QueryNode) -> QueryNode:
+    """Returns an optimized, but equivalent, copy of a parsed query.
+
+    - Chains of the same binary operator are flattened (and rebuilt right-nested).
+    - Duplicate operands of a chain are removed.
+    - Double negations are folded.
+    - Parentheses are only kept where they are needed because of the operator precedence.
+    - The operands of AND chains are ordered so that the (presumably) rarest come first:
+      phrases before words, longer words before shorter ones, then nested expressions
+      and finally negations.
+
+    Equivalent queries mostly end up with the same optimized query, which makes the
+    unparsed query a good cache key.
+    """
+    if isinstance(node, TermNode):
+        return node
+    elif isinstance(node, ParensNode):
+        # Parentheses are added again where necessary by the parent node
+        return optimize_query(node.expression)
+    elif isinstance(node, UnaryNode):
+        operand = optimize_query(node.operand)
+        if isinstance(operand, UnaryNode):
+            return operand.operand
+        return UnaryNode(node.operator, _parenthesize(operand))
+    elif isinstance(node, BinaryNode):
+        operands: list[QueryNode] = []
+        seen: set[str] = set()
+        for operand in _flatten(node, node.operator):
+            operand = optimize_query(operand)
+            for operand in _flatten(operand, node.operator):
+                key = QueryParser.unparse(operand)
+                if key not in seen:
+                    seen.add(key)
+                    operands.append(operand)
+
+        if len(operands) == 1:
+            return operands[0]
+
+        if node.operator == "AND":
+            operands.sort(key=_conjunct_sort_key)
+
+        result = _parenthesize(operands[-1], node.operator)
+        for operand in reversed(operands[:-1]):
+            result = BinaryNode(node.operator, _parenthesize(operand, node.operator), result)
+        return result
+    else:
+        raise ValueError(f"Unknown node type: {type(node)}")
+
+
+def _flatten(node: QueryNode, operator: str) -> list[QueryNode]:
+    if isinstance(node, ParensNode):
+        return _flatten(node.expression, operator)
+    if isinstance(node, BinaryNode) and node.operator == operator:
+        return _flatten(node.left, operator) + _flatten(node.right, operator)
+    return [node]
+
+
+def _parenthesize(node: QueryNode, parent_operator: str = "NOT") -> QueryNode:
+    """Put a node in parentheses if it binds weaker than its parent operator."""
+    if isinstance(node, BinaryNode) and (parent_operator == "NOT" or node.operator == "OR"):
+        return ParensNode(node)
+    return node
+
+
+def _conjunct_sort_key(node: QueryNode) -> tuple[int, int, str]:
+    if isinstance(node, TermNode):
+        category = 0 if node.term_type == "PHRASE" else 1
+        return (category, -len(node.value), node.value)
+    category = 3 if isinstance(node, UnaryNode) else 2
+    return (category, 0, QueryParser.unparse(node))
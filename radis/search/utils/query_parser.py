@@ -1,4 +1,5 @@
 import re
+from functools import cache, lru_cache
 from typing import Callable, Literal, cast
 
 import pyparsing as pp
@@ -53,6 +54,80 @@ class BinaryNode:
 
 QueryNode = TermNode | ParensNode | UnaryNode | BinaryNode
 
+# The maximum number of parsed queries that are cached (per process)
+PARSE_CACHE_SIZE = 1024
+
+QUOTED_SEGMENT_PATTERN = re.compile(r'(".*?(?<!\\)")')
+CONSECUTIVE_OPERATORS_PATTERN = re.compile(
+    r"((?:NOT|AND|OR)\b\s*)(?:(?:NOT|AND|OR)\b\s*)*(?:(?:AND|OR)\b\s*)+((?:NOT\b)*)"
+)
+BINARY_OPERATORS_AT_START_OF_LINE_PATTERN = re.compile(r"^(\s*(AND|OR))+\s*")
+OPERATORS_AT_END_OF_LINE_PATTERN = re.compile(r"(\s*(NOT|AND|OR))+\s*$")
+BINARY_OPERATORS_AT_START_OF_PARENS_PATTERN = re.compile(r"\((\s*(AND|OR))+\s*")
+OPERATORS_AT_END_OF_PARENS_PATTERN = re.compile(r"(\s*(NOT|AND|OR))+\s*\)")
+EMPTY_PARENS_PATTERN = re.compile(r"\(\s*\)")
+SPACES_AT_START_OF_PARENS_PATTERN = re.compile(r"\(\s*")
+SPACES_AT_END_OF_PARENS_PATTERN = re.compile(r"\s*\)")
+MULTIPLE_SPACES_PATTERN = re.compile(r"\s+")
+
+
+@cache
+def _build_grammar() -> pp.ParserElement:
+    """Build the grammar of the query language (only once per process)."""
+
+    # The grammar tries the same sub expressions multiple times (e.g. the alternatives
+    # of an AND expression), which the packrat cache avoids to parse again.
+    pp.ParserElement.enable_packrat()
+
+    not_ = pp.Keyword("NOT")
+    and_ = pp.Keyword("AND")
+    or_ = pp.Keyword("OR")
+    lparen = pp.Literal("(")
+    rparen = pp.Literal(")")
+
+    word = ~(not_ | and_ | or_) + pp.Word(pp.alphanums + pp.alphas8bit + "_-'").set_parse_action(
+        lambda t: TermNode("WORD", t[0])  # type: ignore
+    )
+    phrase = pp.QuotedString(quoteChar='"', esc_char="\\").set_parse_action(
+        lambda t: TermNode("PHRASE", t[0])  # type: ignore
+    )
+    term = phrase | word
+
+    or_expression = pp.Forward()
+
+    parens_expression = pp.Forward()
+    parens_expression <<= (
+        pp.Suppress(lparen) + or_expression + pp.Suppress(rparen)
+    ).set_parse_action(lambda t: ParensNode(t[0])) | term  # type: ignore
+
+    not_expression = pp.Forward()
+    not_expression <<= (not_ + not_expression).set_parse_action(
+        lambda t: UnaryNode("NOT", t[1])  # type: ignore
+    ) | parens_expression
+
+    and_expression = pp.Forward()
+    and_expression <<= (
+        (not_expression + and_ + and_expression).set_parse_action(
+            lambda t: BinaryNode("AND", t[0], t[2])  # type: ignore
+        )
+        | (not_expression + and_expression).set_parse_action(
+            lambda t: BinaryNode("AND", t[0], t[1], implicit=True)  # type: ignore
+        )
+        | not_expression
+    )
+
+    or_expression <<= (and_expression + or_ + or_expression).set_parse_action(
+        lambda t: BinaryNode("OR", t[0], t[2])  # type: ignore
+    ) | and_expression
+
+    return or_expression
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_query(query: str) -> tuple[QueryNode | None, tuple[str, ...]]:
+    node, fixes = QueryParser()._parse(query)
+    return node, tuple(fixes)
+
 
 class QueryParser:
     def __init__(self):
@@ -111,8 +186,7 @@ class QueryParser:
     def _modify_unquoted_segments(
         self, input_string: str, unquoted_segment_handler: Callable[[str], str]
     ) -> str:
-        pattern = re.compile(r'(".*?(?<!\\)")')
-        parts = pattern.split(input_string)
+        parts = QUOTED_SEGMENT_PATTERN.split(input_string)
 
         results: list[str] = []
         for part in parts:
@@ -132,92 +206,112 @@ class QueryParser:
 
         return self._modify_unquoted_segments(input_string, handle_segment)
 
-    def _clean_consecutive_operators(self, input_string) -> str:
-        pattern = r"((?:NOT|AND|OR)\b\s*)(?:(?:NOT|AND|OR)\b\s*)*(?:(?:AND|OR)\b\s*)+((?:NOT\b)*)"
-        return self._modify_unquoted_segments(input_string, lambda s: re.sub(pattern, r"\1\2", s))
+    # The following cleanups are all applied to unquoted segments of the query (see
+    # _clean_unquoted_segments).
 
-    def _clean_binary_operators_at_start_of_line(self, input_string: str) -> str:
-        pattern = r"^(\s*(AND|OR))+\s*"
-        cleaned_string = re.sub(pattern, r"", input_string)
-        return cleaned_string
+    def _clean_consecutive_operators(self, segment: str) -> str:
+        return CONSECUTIVE_OPERATORS_PATTERN.sub(r"\1\2", segment)
 
-    def _clean_operators_at_end_of_line(self, input_string: str) -> str:
-        pattern = r"(\s*(NOT|AND|OR))+\s*$"
-        cleaned_string = re.sub(pattern, r"", input_string)
-        return cleaned_string
+    def _clean_binary_operators_at_start_of_line(self, segment: str) -> str:
+        return BINARY_OPERATORS_AT_START_OF_LINE_PATTERN.sub("", segment)
 
-    def _clean_binary_operators_at_start_of_parens(self, input_string: str) -> str:
-        pattern = r"\((\s*(AND|OR))+\s*"
-        return self._modify_unquoted_segments(input_string, lambda s: re.sub(pattern, r"(", s))
+    def _clean_operators_at_end_of_line(self, segment: str) -> str:
+        return OPERATORS_AT_END_OF_LINE_PATTERN.sub("", segment)
 
-    def _clean_operators_at_end_of_parens(self, input_string: str) -> str:
-        pattern = r"(\s*(NOT|AND|OR))+\s*\)"
-        return self._modify_unquoted_segments(input_string, lambda s: re.sub(pattern, r")", s))
+    def _clean_binary_operators_at_start_of_parens(self, segment: str) -> str:
+        return BINARY_OPERATORS_AT_START_OF_PARENS_PATTERN.sub("(", segment)
 
-    def _clean_empty_parens(self, input_string: str) -> str:
-        pattern = r"\(\s*\)"
-        return self._modify_unquoted_segments(input_string, lambda s: re.sub(pattern, r"", s))
+    def _clean_operators_at_end_of_parens(self, segment: str) -> str:
+        return OPERATORS_AT_END_OF_PARENS_PATTERN.sub(")", segment)
 
-    def _strip_trailing_spaces(self, input_string: str) -> str:
-        cleaned_string = input_string.strip()
-        return cleaned_string
+    def _clean_empty_parens(self, segment: str) -> str:
+        return EMPTY_PARENS_PATTERN.sub("", segment)
 
-    def _delete_spaces_at_start_of_parens(self, input_string: str):
-        return self._modify_unquoted_segments(input_string, lambda s: re.sub(r"\(\s*", "(", s))
+    def _delete_spaces_at_start_of_parens(self, segment: str) -> str:
+        return SPACES_AT_START_OF_PARENS_PATTERN.sub("(", segment)
 
-    def _delete_spaces_at_end_of_parens(self, input_string: str) -> str:
-        return self._modify_unquoted_segments(input_string, lambda s: re.sub(r"\s*\)", ")", s))
+    def _delete_spaces_at_end_of_parens(self, segment: str) -> str:
+        return SPACES_AT_END_OF_PARENS_PATTERN.sub(")", segment)
 
-    def _reduce_spaces(self, input_string: str) -> str:
-        return self._modify_unquoted_segments(input_string, lambda s: re.sub(r"\s+", " ", s))
+    def _reduce_spaces(self, segment: str) -> str:
+        return MULTIPLE_SPACES_PATTERN.sub(" ", segment)
 
-    def _parse_string(self, input_string: str) -> QueryNode:
-        not_ = pp.Keyword("NOT")
-        and_ = pp.Keyword("AND")
-        or_ = pp.Keyword("OR")
-        lparen = pp.Literal("(")
-        rparen = pp.Literal(")")
-
-        word = ~(not_ | and_ | or_) + pp.Word(
-            pp.alphanums + pp.alphas8bit + "_-'"
-        ).set_parse_action(
-            lambda t: TermNode("WORD", t[0])  # type: ignore
+    def _clean_unquoted_segments(self, input_string: str, fixes: list[str]) -> str:
+        """Apply all the cleanups to the unquoted segments of the query.
+
+        The query is only split into its segments once. This works as the cleanups
+        never add or remove any quotes (the invalid characters, which includes stray
+        quotes, must already be removed).
+        """
+        # The split results in alternating unquoted and quoted segments, starting and
+        # ending with an unquoted (maybe empty) one.
+        segments = QUOTED_SEGMENT_PATTERN.split(input_string)
+        all_segments = range(0, len(segments), 2)
+        first_segment = [0]
+        last_segment = [len(segments) - 1]
+
+        def clean(handler: Callable[[str], str], indexes: range | list[int], fix: str = ""):
+            changed = False
+            for index in indexes:
+                cleaned = handler(segments[index])
+                if cleaned != segments[index]:
+                    segments[index] = cleaned
+                    changed = True
+            if changed and fix:
+                fixes.append(fix)
+
+        clean(
+            self._clean_consecutive_operators,
+            all_segments,
+            "Fixed invalid consecutive operators",
+        )
+        clean(
+            self._clean_binary_operators_at_start_of_line,
+            first_segment,
+            "Fixed invalid operators at start of line",
+        )
+        clean(
+            self._clean_operators_at_end_of_line,
+            last_segment,
+            "Fixed invalid operators at end of line",
         )
-        phrase = pp.QuotedString(quoteChar='"', esc_char="\\").set_parse_action(
-            lambda t: TermNode("PHRASE", t[0])  # type: ignore
+        clean(
+            self._clean_binary_operators_at_start_of_parens,
+            all_segments,
+            "Fixed invalid operators at start of parentheses",
         )
-        term = phrase | word
+        clean(
+            self._clean_operators_at_end_of_parens,
+            all_segments,
+            "Fixed invalid operators at end of parentheses",
+        )
+        clean(self._clean_empty_parens, all_segments, "Fixed empty parentheses")
 
-        or_expression = pp.Forward()
+        clean(str.lstrip, first_segment)
+        clean(str.rstrip, last_segment)
+        clean(self._delete_spaces_at_start_of_parens, all_segments)
+        clean(self._delete_spaces_at_end_of_parens, all_segments)
+        clean(self._reduce_spaces, all_segments)
 
-        parens_expression = pp.Forward()
-        parens_expression <<= (
-            pp.Suppress(lparen) + or_expression + pp.Suppress(rparen)
-        ).set_parse_action(lambda t: ParensNode(t[0])) | term  # type: ignore
+        return "".join(segments)
 
-        not_expression = pp.Forward()
-        not_expression <<= (not_ + not_expression).set_parse_action(
-            lambda t: UnaryNode("NOT", t[1])  # type: ignore
-        ) | parens_expression
+    def _parse_string(self, input_string: str) -> QueryNode:
+        grammar = _build_grammar()
+        return cast(QueryNode, grammar.parse_string(input_string, parse_all=True)[0])
 
-        and_expression = pp.Forward()
-        and_expression <<= (
-            (not_expression + and_ + and_expression).set_parse_action(
-                lambda t: BinaryNode("AND", t[0], t[2])  # type: ignore
-            )
-            | (not_expression + and_expression).set_parse_action(
-                lambda t: BinaryNode("AND", t[0], t[1], implicit=True)  # type: ignore
-            )
-            | not_expression
-        )
+    def parse(self, query: str) -> tuple[QueryNode | None, list[str]]:
+        """Parse a query (and fix it if necessary).
 
-        or_expression <<= (and_expression + or_ + or_expression).set_parse_action(
-            lambda t: BinaryNode("OR", t[0], t[2])  # type: ignore
-        ) | and_expression
+        The results are cached, so the returned nodes are shared and must not be
+        modified.
 
-        return cast(QueryNode, or_expression.parse_string(input_string, parse_all=True)[0])
+        Returns: The root node of the query (or None if the query is empty) and the
+        applied fixes.
+        """
+        node, fixes = _parse_query(query)
+        return node, list(fixes)
 
-    def parse(self, query: str) -> tuple[QueryNode | None, list[str]]:
+    def _parse(self, query: str) -> tuple[QueryNode | None, list[str]]:
         fixes: list[str] = []
 
         query_before = query
@@ -235,40 +329,7 @@ class QueryParser:
         if query_before != query_after:
             fixes.append("Fixed invalid characters")
 
-        query_before = query_after
-        query_after = self._clean_consecutive_operators(query_before)
-        if query_before != query_after:
-            fixes.append("Fixed invalid consecutive operators")
-
-        query_before = query_after
-        query_after = self._clean_binary_operators_at_start_of_line(query_before)
-        if query_before != query_after:
-            fixes.append("Fixed invalid operators at start of line")
-
-        query_before = query_after
-        query_after = self._clean_operators_at_end_of_line(query_before)
-        if query_before != query_after:
-            fixes.append("Fixed invalid operators at end of line")
-
-        query_before = query_after
-        query_after = self._clean_binary_operators_at_start_of_parens(query_before)
-        if query_before != query_after:
-            fixes.append("Fixed invalid operators at start of parentheses")
-
-        query_before = query_after
-        query_after = self._clean_operators_at_end_of_parens(query_before)
-        if query_before != query_after:
-            fixes.append("Fixed invalid operators at end of parentheses")
-
-        query_before = query_after
-        query_after = self._clean_empty_parens(query_before)
-        if query_before != query_after:
-            fixes.append("Fixed empty parentheses")
-
-        query_after = self._strip_trailing_spaces(query_after)
-        query_after = self._delete_spaces_at_start_of_parens(query_after)
-        query_after = self._delete_spaces_at_end_of_parens(query_after)
-        query_after = self._reduce_spaces(query_after)
+        query_after = self._clean_unquoted_segments(query_after, fixes)
 
         if query_after == "":
             return None, fixes
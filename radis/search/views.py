@@ -1,6 +1,7 @@
 from typing import Any
 
 from adit_radis_shared.common.types import AuthenticatedHttpRequest
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.core.paginator import Paginator
 from django.http import Http404, HttpRequest
@@ -11,6 +12,7 @@ from radis.search.forms import SearchForm
 from radis.search.utils.query_parser import QueryParser
 
 from .site import Search, SearchFilters, search_providers
+from .utils.cache_utils import cached_search
 
 
 class SearchView(LoginRequiredMixin, UserPassesTestMixin, View):
@@ -77,8 +79,11 @@ class SearchView(LoginRequiredMixin, UserPassesTestMixin, View):
                 ),
                 offset=offset,
                 limit=page_size,
+                count_strategy=settings.SEARCH_COUNT_STRATEGY,
+                # We never paginate beyond the max results, so there is no need to count more
+                count_limit=search_provider.max_results,
             )
-            result = search_provider.search(search)
+            result = cached_search(search_provider, search)
             total_count = result.total_count
 
             if total_count is not None:
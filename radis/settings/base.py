@@ -131,6 +131,21 @@ MESSAGE_STORAGE = "django.contrib.messages.storage.session.SessionStorage"
 # Loads the DB setup from the DATABASE_URL environment variable.
 DATABASES = {"default": env.db()}
 
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Caches the results of the search view (see search/utils/cache_utils.py). It
+    # can be replaced by any other cache backend (like a shared Redis cache).
+    "search": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "search",
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 1000},
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -286,6 +301,24 @@ FILTERS_EMPTY_CHOICE_LABEL = "Show All"
 
 # llama.cpp
 LLAMACPP_URL = env.str("LLAMACPP_URL")
+# The number of parallel slots of the llama.cpp server (its --parallel option). If set,
+# requests about the same report are always sent to the same slot, so that the prompt
+# cache of the slot can be reused for the shared prefix (the report). 0 disables this.
+LLAMACPP_SLOTS = env.int("LLAMACPP_SLOTS", default=0)
+# Identifies the model of the llama.cpp server, so that cached answers of another model
+# are not reused (see CHAT_ANSWER_CACHE_ENABLED).
+LLM_MODEL_URL = env.str("LLM_MODEL_URL", default="")
+# The maximum number of requests that are sent to the LLM at the same time by all workers
+# and web servers together (e.g. the --parallel option of llama.cpp). The requests wait for
+# a free slot, which is leased in the database. 0 disables this limit.
+LLM_CONCURRENCY_LIMIT = env.int("LLM_CONCURRENCY_LIMIT", default=0)
+# How long (in seconds) a request waits before it checks again for a free slot.
+LLM_CONCURRENCY_POLL_INTERVAL = 0.5
+# The timeout (in seconds) of a single LLM request and how often a failed request is
+# retried. The slot of a request is held for at most this long (including the retries)
+# before it is freed (e.g. because the worker died).
+LLM_REQUEST_TIMEOUT = 600
+LLM_REQUEST_MAX_RETRIES = 2
 
 # Chat
 CHAT_GENERATE_TITLE_SYSTEM_PROMPT = """
@@ -335,11 +368,63 @@ Question: $question
 Answer:
 """
 
+CHAT_REPORT_YES_NO_QUESTIONS_SYSTEM_PROMPT = """
+You are an AI medical assistant with extensive knowledge in radiology and general medicine.
+You have been trained on a wide range of medical literature, including the latest research
+and guidelines in radiological practices. You will be asked multiple numbered questions about
+a radiological report that you have to answer. The report and each question can be given
+in any language. Answer each question in English faithfully with "Yes" or "No". Respond with
+a JSON object that maps the number of each question to its answer.
+
+Report: $report
+"""
+
+CHAT_REPORT_QUESTIONS_USER_PROMPT = """
+Questions:
+$questions
+Answers:
+"""
+
 CHAT_YES_NO_ANSWER_GRAMMAR = """
 root ::= Answer
 Answer ::= "Yes" | "No"
 """
 
+# Store the answers of the LLM about reports in the database, so that the same question
+# about the same report (e.g. of a restarted RAG job or a subscription) is only asked once.
+# The cache is only used if the model is known (see LLM_MODEL_URL), as otherwise the
+# answers of a previous model would be reused after the model changed.
+CHAT_ANSWER_CACHE_ENABLED = True
+# How long (in days) and how many answers are kept in the cache.
+CHAT_ANSWER_CACHE_MAX_AGE = 90
+CHAT_ANSWER_CACHE_MAX_ENTRIES = 5_000_000
+# Regularly evicts the cached answers that are too old or too many.
+CHAT_ANSWER_CACHE_EVICTION_CRON = "30 3 * * *"
+
+# Reports
+# The number of reports that are validated and committed together when reports are
+# streamed as NDJSON to the reports API.
+REPORTS_STREAM_BATCH_SIZE = 1000
+
+# Search
+# How the total number of search results is determined in the search view. "exact" counts
+# all results, "capped" counts only up to the maximum results of the search provider and
+# "estimated" uses the estimate of the database query planner.
+SEARCH_COUNT_STRATEGY = "capped"
+# The cache (see CACHES) for the results of the search view, or None to disable caching.
+SEARCH_CACHE_ALIAS = "search"
+# The search providers that are queried (concurrently) by the federated search provider,
+# or None for all registered ones.
+SEARCH_FEDERATED_PROVIDERS: list[str] | None = None
+# How long the federated search waits for each provider (in seconds).
+SEARCH_FEDERATED_TIMEOUT = 10
+# The constant of the reciprocal rank fusion (dampens the impact of the top ranks).
+SEARCH_FEDERATED_RRF_K = 60
+# The number of queued reports that are indexed together by the search indexers.
+SEARCH_INDEXING_BATCH_SIZE = 500
+# Regularly processes queued reports whose indexing job got lost.
+SEARCH_INDEXING_CRON = "*/5 * * * *"
+
 # RAG
 RAG_DEFAULT_PRIORITY = 2
 RAG_URGENT_PRIORITY = 3
@@ -347,12 +432,18 @@ RAG_URGENT_PRIORITY = 3
 # The number of RAG report instances that are processed within one task. There are multiple
 # questions associated with each report instance via the RagJob.
 RAG_TASK_BATCH_SIZE = 64
+# The number of RAG tasks that are created together (in bulk) when a RAG job is prepared.
+RAG_TASK_CREATION_BATCH_SIZE = 100
 # The number of parallel requests the LLM can handle. This limit is enforced within each task. When
 # having multiple workers, the total number of parallel requests is
-# RAG_LLM_CONCURRENCY_LIMIT * number of workers. Either the number of HTTP Threads and number of
+# RAG_LLM_CONCURRENCY_LIMIT * number of workers (unless limited by LLM_CONCURRENCY_LIMIT across
+# all workers). Either the number of HTTP Threads and number of
 # parallel computing slots of the llama.cpp should be set to match this number or the continuous
 # batching capability of the LLM or a combination of both should be used.
 RAG_LLM_CONCURRENCY_LIMIT = 6
+# Answer all the questions of a RAG job about a report with one LLM completion (instead
+# of one completion per question), so that the report only has to be processed once.
+RAG_BATCH_QUESTIONS = False
 
 START_RAG_JOB_UNVERIFIED = False
 
@@ -362,3 +453,6 @@ SUBSCRIPTION_DEFAULT_PRIORITY = 3
 SUBSCRIPTION_URGENT_PRIORITY = 4
 SUBSCRIPTION_CRON = "* * * * *"
 SUBSCRIPTION_REFRESH_TASK_BATCH_SIZE = 64
+# The number of subscription tasks that are created together (in bulk) when a subscription
+# job is prepared.
+SUBSCRIPTION_TASK_CREATION_BATCH_SIZE = 100
@@ -10,6 +10,11 @@ from django import db
 from django.conf import settings
 from django.db.models import QuerySet
 
+from radis.chats.utils.answer_cache import (
+    acache_answers,
+    aget_cached_answers,
+    build_yes_no_answer_cache_key,
+)
 from radis.chats.utils.chat_client import AsyncChatClient
 from radis.core.processors import AnalysisTaskProcessor
 from radis.reports.models import Report
@@ -80,7 +85,13 @@ class SubscriptionTaskProcessor(AnalysisTaskProcessor):
         question: SubscriptionQuestion,
         client: AsyncChatClient,
     ) -> RagResult:
-        llm_answer = await client.ask_report_yes_no_question(report_body, question.question)
+        cache_key = build_yes_no_answer_cache_key(report_body, question.question)
+        cached_answers = await aget_cached_answers([cache_key])
+        if cache_key in cached_answers:
+            llm_answer = cached_answers[cache_key]
+        else:
+            llm_answer = await client.ask_report_yes_no_question(report_body, question.question)
+            await acache_answers({cache_key: llm_answer})
 
         if llm_answer == "yes":
             answer = Answer.YES
@@ -1,16 +1,17 @@
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from itertools import batched
 
 from django.conf import settings
 from django.db import transaction
-from django.utils import timezone
 from pebble import asynchronous
 from procrastinate.contrib.django import app
 
+from radis.core.utils.model_utils import delay_tasks
 from radis.rag.site import retrieval_providers
 from radis.reports.models import Report
 from radis.search.site import Search, SearchFilters
+from radis.search.utils.indexing_utils import get_indexed_until
 from radis.search.utils.query_parser import QueryParser
 
 from .models import Subscription, SubscriptionJob, SubscriptionTask
@@ -44,6 +45,10 @@ def process_subscription_job(job_id: int) -> None:
 
     logger.debug("Collecting tasks for job %s", job)
 
+    # Only the reports that are already indexed are searched, the ones that are
+    # still queued for indexing are picked up by the next job.
+    refreshed_until = get_indexed_until(job.subscription.last_refreshed)
+
     language_code = ""
     if job.subscription.language and job.subscription.query != "":
         language_code = job.subscription.language.code
@@ -57,6 +62,7 @@ def process_subscription_job(job_id: int) -> None:
         patient_age_from=job.subscription.age_from,
         patient_age_till=job.subscription.age_till,
         created_after=job.subscription.last_refreshed,
+        created_before=refreshed_until - timedelta(microseconds=1),
     )
 
     if job.subscription.query != "":
@@ -89,17 +95,53 @@ def process_subscription_job(job_id: int) -> None:
         filter_provider = filter_providers[provider]
         new_document_ids = filter_provider.filter(filters)
 
-    for document_ids in batched(new_document_ids, settings.SUBSCRIPTION_REFRESH_TASK_BATCH_SIZE):
-        logger.debug("Creating SubscriptionTask for document IDs: %s", document_ids)
-        task = SubscriptionTask.objects.create(job=job, status=SubscriptionTask.Status.PENDING)
-        for document_id in document_ids:
-            task.reports.add(Report.objects.get(document_id=document_id))
+    deferrer = process_subscription_task.configure(
+        priority=job.urgent_priority if job.urgent else job.default_priority
+    )
+
+    # The tasks are created in bulk for many new documents at once (see process_rag_job)
+    creation_batch_size = (
+        settings.SUBSCRIPTION_REFRESH_TASK_BATCH_SIZE
+        * settings.SUBSCRIPTION_TASK_CREATION_BATCH_SIZE
+    )
+    for document_ids in batched(new_document_ids, creation_batch_size):
+        report_ids = dict(
+            Report.objects.filter(document_id__in=document_ids).values_list("document_id", "id")
+        )
+        report_id_batches = list(
+            batched(
+                [
+                    report_ids[document_id]
+                    for document_id in document_ids
+                    if document_id in report_ids
+                ],
+                settings.SUBSCRIPTION_REFRESH_TASK_BATCH_SIZE,
+            )
+        )
 
-        task.delay()
+        with transaction.atomic():
+            tasks = SubscriptionTask.objects.bulk_create(
+                [
+                    SubscriptionTask(job=job, status=SubscriptionTask.Status.PENDING)
+                    for _ in report_id_batches
+                ]
+            )
+            SubscriptionTask.reports.through.objects.bulk_create(
+                [
+                    SubscriptionTask.reports.through(
+                        subscriptiontask_id=task.pk, report_id=report_id
+                    )
+                    for task, batch in zip(tasks, report_id_batches)
+                    for report_id in batch
+                ]
+            )
+            delay_tasks(tasks, deferrer)
+
+        logger.debug("Created %d SubscriptionTasks for job %s", len(tasks), job)
 
     logger.debug("Starting SubscriptionTasks done.")
 
-    job.subscription.last_refreshed = timezone.now()
+    job.subscription.last_refreshed = refreshed_until
     job.subscription.save()
 
     job.status = SubscriptionJob.Status.PENDING